@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+KEY_PREFIX = 'auth-user'
+
+# Поля, которых достаточно для аутентификации и проверки прав,
+# в порядке полей модели, которого ожидает from_db.
+PRINCIPAL_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in (
+        'id', 'username', 'role', 'is_staff', 'is_superuser', 'is_active'
+    )
+)
+
+
+def _settings():
+    return settings.AUTH_USER_CACHE
+
+
+def get_cache():
+    return caches[_settings()['ALIAS']]
+
+
+# Утверждения токена с ролью: поле пользователя → имя утверждения.
+ROLE_CLAIMS = {
+    'username': 'username',
+    'role': 'role',
+    'is_staff': 'is_staff',
+    'is_superuser': 'is_superuser',
+    'token_version': 'ver',
+}
+
+
+def principal_key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def version_key(user_id):
+    return f'{KEY_PREFIX}-version:{user_id}'
+
+
+def forget_principal(user_id):
+    get_cache().delete_many((principal_key(user_id), version_key(user_id)))
+
+
+def token_for(user):
+    """
+    Токен доступа для пользователя. С JWT_ROLE_CLAIMS в него
+    записываются роль, флаги администратора и версия токенов.
+    """
+    token = RefreshToken.for_user(user).access_token
+    if settings.JWT_ROLE_CLAIMS:
+        for field, claim in ROLE_CLAIMS.items():
+            token[claim] = getattr(user, field)
+    return token
+
+
+def current_token_version(user_id):
+    """
+    Текущая версия токенов пользователя или None, если его нет
+    или он заблокирован. Хранится в кеше VERSION_TIMEOUT секунд.
+    """
+    cache = get_cache()
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(
+            **{jwt_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, _settings()['VERSION_TIMEOUT'])
+    return version
+
+
+def claims_user(validated_token):
+    """
+    Пользователь, восстановленный из утверждений токена без обращения
+    к базе. Остальные поля загружаются при первом обращении.
+    """
+    values = {
+        field: validated_token[claim] for field, claim in ROLE_CLAIMS.items()
+        if field != 'token_version'
+    }
+    values.update(
+        id=validated_token[jwt_settings.USER_ID_CLAIM], is_active=True
+    )
+    return User.from_db(
+        User.objects.db, PRINCIPAL_FIELDS,
+        [values[field] for field in PRINCIPAL_FIELDS]
+    )
+
+
+def load_principal(user_id):
+    """
+    Пользователь с загруженными полями PRINCIPAL_FIELDS. Значения
+    хранятся в кеше TIMEOUT секунд; остальные поля загружаются
+    из базы при первом обращении, как у only().
+    """
+    cache = get_cache()
+    key = principal_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.filter(
+            **{jwt_settings.USER_ID_FIELD: user_id}
+        ).values_list(*PRINCIPAL_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, _settings()['TIMEOUT'])
+    return User.from_db(User.objects.db, PRINCIPAL_FIELDS, values)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса к таблице пользователей на каждый
+    запрос: пользователь берётся из кеша, который сбрасывается при
+    сохранении и удалении пользователя. С CHECK_REVOKE_TOKEN нужен хеш
+    пароля, поэтому пользователь загружается из базы как обычно.
+    Пользователь токена с ролью восстанавливается из утверждений,
+    а токен принимается, только если его версия совпадает с текущей.
+    """
+
+    def get_user(self, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        if ROLE_CLAIMS['token_version'] in validated_token:
+            if (validated_token[ROLE_CLAIMS['token_version']]
+                    != current_token_version(user_id)):
+                raise AuthenticationFailed(
+                    'Токен отозван.', code='token_revoked'
+                )
+            return claims_user(validated_token)
+        user = load_principal(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,103 @@
+import threading
+from bisect import bisect_left
+
+from reviews.models import Category, Genre, Title
+from .cache import versions
+
+NAMESPACE = 'autocomplete'
+
+DEFAULT_LIMIT = 10
+
+MAX_LIMIT = 50
+
+SOURCES = {
+    'title': Title,
+    'genre': Genre,
+    'category': Category,
+}
+
+KINDS = tuple(SOURCES)
+
+
+def normalize(text):
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+class PrefixIndex:
+    """
+    Отсортированный список ключей для поиска по началу слова.
+    Для каждого имени хранятся все его суффиксы по словам, поэтому
+    «Машина времени» находится и по «маш», и по «вре».
+    """
+
+    def __init__(self, names):
+        entries = []
+        for kind, pk, name in names:
+            words = normalize(name).split(' ')
+            for position in range(len(words)):
+                key = ' '.join(words[position:])
+                entries.append((key, kind, pk, name))
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, prefix, kinds=KINDS, limit=DEFAULT_LIMIT):
+        """
+        Возвращает до limit объектов, имя которых содержит слово,
+        начинающееся с prefix, в алфавитном порядке совпавших ключей.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(results) < limit:
+            key, kind, pk, name = self.entries[position]
+            position += 1
+            if not key.startswith(prefix):
+                break
+            if kind not in kinds or (kind, pk) in seen:
+                continue
+            seen.add((kind, pk))
+            results.append({'type': kind, 'id': pk, 'name': name})
+        return results
+
+
+def build_index():
+    return PrefixIndex(
+        (kind, pk, name)
+        for kind, model in SOURCES.items()
+        for pk, name in model.objects.order_by().values_list(
+            'pk', 'name'
+        ).iterator()
+    )
+
+
+class VersionedIndex:
+    """
+    Индекс в памяти процесса. Перестраивается при следующем запросе
+    после смены версии пространства имён autocomplete, которую
+    сигналы меняют при изменении названий.
+    """
+
+    def __init__(self, builder=build_index):
+        self.builder = builder
+        self.index = None
+        self.version = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        version, = versions(NAMESPACE)
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.index = self.builder()
+                    self.version = version
+        return self.index
+
+
+autocomplete_index = VersionedIndex()
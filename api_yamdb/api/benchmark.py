@@ -0,0 +1,541 @@
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from io import BytesIO
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection, reset_queries
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, reverse
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.serializers import ReviewSerializer, TitleGETSerializer
+from api.urls import router, urlpatterns
+from api.views import EXPORT_TABLES
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.ratings import rebuild_ratings
+from reviews.utils import batched
+
+User = get_user_model()
+
+BENCHMARK_PREFIX = 'bench'
+CONFIRMATION_CODE = 'benchmark'
+
+
+class BenchmarkError(Exception):
+    """
+    Эндпоинт ответил ошибкой, и замер не отражает его работу.
+    """
+
+
+def unthrottled():
+    """
+    Отключает ограничения частоты: иначе повторные замеры эндпоинтов
+    авторизации измеряли бы ответы 429.
+    """
+    rest_framework = settings.REST_FRAMEWORK
+    return override_settings(REST_FRAMEWORK={
+        **rest_framework,
+        'DEFAULT_THROTTLE_RATES': {
+            scope: None
+            for scope in rest_framework.get('DEFAULT_THROTTLE_RATES', {})
+        },
+    })
+
+
+def uncached():
+    """
+    Отключает кеш ответов: иначе все замеры, кроме первого, были бы
+    попаданиями в кеш и не измеряли работу с базой.
+    """
+    return override_settings(API_RESPONSE_CACHE={
+        **settings.API_RESPONSE_CACHE, 'ENABLED': False
+    })
+
+
+@contextmanager
+def isolated_caches():
+    """
+    Подменяет все кеши приватными кешами в памяти процесса. Записанное
+    во время прогона (пользователи, ответы, версии) не переживает
+    отката данных и не видно другим процессам.
+    """
+    location = f'benchmark-{uuid4().hex}'
+    with override_settings(CACHES={
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'{location}-{alias}',
+        }
+        for alias in settings.CACHES
+    }):
+        try:
+            yield
+        finally:
+            for alias in settings.CACHES:
+                caches[alias].clear()
+
+
+def check_status(response, method, url):
+    if not 200 <= response.status_code < 300:
+        raise BenchmarkError(
+            f'{method.upper()} {url}: ответ {response.status_code}'
+        )
+    return response
+
+
+def perform(client, method, url, data=None):
+    """
+    Выполняет запрос и проверяет код ответа. Потоковый ответ читается
+    целиком, чтобы в замер попала его генерация.
+    """
+    response = check_status(
+        getattr(client, method)(url, data=data, format='json'), method, url
+    )
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def bulk_insert(model, objects, batch_size):
+    """
+    Вставляет объекты из генератора пачками, не держа их все в памяти.
+    """
+    for batch in batched(objects, batch_size):
+        model.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def _next_id(model):
+    return (model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0) + 1
+
+
+def seed_data(titles, reviews, comments, genres=20, categories=10,
+              batch_size=5000):
+    """
+    Заполняет базу синтетическими данными заданного объёма.
+    Авторов создаётся столько, чтобы отзывы не нарушали
+    уникальность пары (произведение, автор).
+    """
+    users = max(1, -(-reviews // max(titles, 1)))
+    first = {
+        model: _next_id(model)
+        for model in (User, Category, Genre, Title, GenreTitle, Review,
+                      Comment)
+    }
+    bulk_insert(User, (
+        User(
+            id=first[User] + idx,
+            username=f'{BENCHMARK_PREFIX}{first[User] + idx}',
+            email=f'{BENCHMARK_PREFIX}{first[User] + idx}@yamdb.fake',
+        )
+        for idx in range(users)
+    ), batch_size)
+    bulk_insert(Category, (
+        Category(
+            id=first[Category] + idx,
+            name=f'Категория {idx}',
+            slug=f'{BENCHMARK_PREFIX}-category-{first[Category] + idx}'
+        )
+        for idx in range(categories)
+    ), batch_size)
+    bulk_insert(Genre, (
+        Genre(
+            id=first[Genre] + idx,
+            name=f'Жанр {idx}',
+            slug=f'{BENCHMARK_PREFIX}-genre-{first[Genre] + idx}'
+        )
+        for idx in range(genres)
+    ), batch_size)
+    bulk_insert(Title, (
+        Title(
+            id=first[Title] + idx,
+            name=f'Произведение {idx}',
+            year=1900 + idx % 120,
+            description=f'Описание произведения {idx}',
+            category_id=first[Category] + idx % categories
+        )
+        for idx in range(titles)
+    ), batch_size)
+    bulk_insert(GenreTitle, (
+        GenreTitle(
+            id=first[GenreTitle] + idx,
+            title_id=first[Title] + idx // 2,
+            genre_id=first[Genre] + (idx // 2 + idx % 2) % genres
+        )
+        for idx in range(titles * 2)
+    ), batch_size)
+    bulk_insert(Review, (
+        Review(
+            id=first[Review] + idx,
+            title_id=first[Title] + idx % titles,
+            author_id=first[User] + idx // titles,
+            text=f'Отзыв {idx}',
+            score=1 + idx % 10
+        )
+        for idx in range(reviews)
+    ), batch_size)
+    bulk_insert(Comment, (
+        Comment(
+            id=first[Comment] + idx,
+            review_id=first[Review] + idx % reviews,
+            author_id=first[User] + idx % users,
+            text=f'Комментарий {idx}'
+        )
+        for idx in range(comments if reviews else 0)
+    ), batch_size)
+    rebuild_ratings(Title.objects.filter(pk__gte=first[Title]))
+    return {
+        'title': first[Title],
+        'review': first[Review],
+        'comment': first[Comment],
+    }
+
+
+def _route_kwargs(prefix, seeded):
+    kwargs = {}
+    if '(?P<title_id>' in prefix:
+        kwargs['title_id'] = seeded['title']
+    if '(?P<review_id>' in prefix:
+        kwargs['review_id'] = seeded['review']
+    return kwargs
+
+
+def _detail_lookup(viewset, seeded, kwargs):
+    lookup_field = getattr(viewset, 'lookup_field', 'pk')
+    if lookup_field == 'username':
+        return seeded['user'].username
+    if 'review_id' in kwargs:
+        return seeded['comment']
+    if 'title_id' in kwargs:
+        return seeded['review']
+    return seeded['title']
+
+
+def _handles_get(view):
+    actions = getattr(view, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    return hasattr(view.view_class, 'get')
+
+
+def plain_routes(patterns=urlpatterns):
+    """
+    Имена GET-маршрутов api/urls.py, подключённых без роутера.
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.urlconf_name is not router.urls:
+                yield from plain_routes(pattern.url_patterns)
+        elif pattern.name and _handles_get(pattern.callback):
+            yield pattern.name
+
+
+def _route_variants(name, title):
+    """
+    Адреса маршрута вне роутера: (имя замера, аргументы, строка запроса).
+    """
+    if name == 'export':
+        return [(f'export-{table}', {'table': table}, '')
+                for table in EXPORT_TABLES]
+    if name == 'search':
+        return [(name, {}, f'?q={title.name.split()[0]}')]
+    if name == 'autocomplete':
+        return [(name, {}, f'?q={title.name[:3]}')]
+    return [(name, {}, '')]
+
+
+def collect_endpoints(seeded):
+    """
+    Собирает GET-эндпоинты всех маршрутов роутера и остальных маршрутов
+    api/urls.py, список произведений с фильтрами по категории, жанру
+    и набору жанров и POST-эндпоинты регистрации и получения токена.
+    """
+    endpoints = []
+    for prefix, viewset, basename in router.registry:
+        kwargs = _route_kwargs(prefix, seeded)
+        if hasattr(viewset, 'list'):
+            endpoints.append((
+                f'{basename}-list', 'get',
+                reverse(f'{basename}-list', kwargs=kwargs), None
+            ))
+        lookup = getattr(viewset, 'lookup_field', 'pk')
+        detail_kwargs = dict(
+            kwargs, **{lookup: _detail_lookup(viewset, seeded, kwargs)}
+        )
+        if hasattr(viewset, 'retrieve'):
+            endpoints.append((
+                f'{basename}-detail', 'get',
+                reverse(f'{basename}-detail', kwargs=detail_kwargs), None
+            ))
+        for action in viewset.get_extra_actions():
+            if 'get' not in action.mapping:
+                continue
+            name = f'{basename}-{action.url_name}'
+            url = reverse(
+                name, kwargs=detail_kwargs if action.detail else kwargs
+            )
+            endpoints.append((name, 'get', url, None))
+    title = Title.objects.select_related('category').get(pk=seeded['title'])
+    for route in plain_routes():
+        for name, kwargs, query in _route_variants(route, title):
+            endpoints.append((
+                name, 'get', reverse(route, kwargs=kwargs) + query, None
+            ))
+    genres = [genre.slug for genre in title.genre.all()]
+    titles_url = reverse('titles-list')
+    if title.category is not None:
+        endpoints.append((
+            'titles-list-category', 'get',
+            f'{titles_url}?category={title.category.slug}', None
+        ))
+    if genres:
+        endpoints.append((
+            'titles-list-genre', 'get',
+            f'{titles_url}?genre={genres[0]}', None
+        ))
+        endpoints.append((
+            'titles-list-genres-all', 'get',
+            f'{titles_url}?genre={",".join(genres)}&genre_mode=all', None
+        ))
+    user = seeded['user']
+    endpoints.append((
+        'get_token', 'post', reverse('get_token'),
+        {
+            'username': user.username,
+            'confirmation_code': CONFIRMATION_CODE
+        }
+    ))
+    endpoints.append((
+        'sign_up', 'post', reverse('sign_up'),
+        {'username': user.username, 'email': user.email}
+    ))
+    return endpoints
+
+
+def _percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def measure_endpoint(client, method, url, data=None, repeat=20):
+    """
+    Возвращает p50/p95 задержки в миллисекундах, число SQL-запросов
+    и пиковое потребление памяти в КиБ для одного эндпоинта.
+    """
+    # Обработчик request_started очищает журнал запросов соединения,
+    # поэтому замер начинается с пустого журнала.
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response = perform(client, method, url, data)
+    # Список запросов вычисляется лениво по журналу соединения,
+    # который следующие запросы очистят.
+    query_count = len(queries)
+    timings = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        perform(client, method, url, data)
+        timings.append((time.perf_counter() - started) * 1000)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    perform(client, method, url, data)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if not tracing:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'p50_ms': round(_percentile(timings, 50), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'queries': query_count,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def existing_objects():
+    """
+    Возвращает объекты для подстановки в адреса эндпоинтов из уже
+    заполненной базы или None, если в ней нет комментариев.
+    """
+    comment = Comment.objects.select_related('review').first()
+    if comment is None:
+        return None
+    return {
+        'title': comment.review.title_id,
+        'review': comment.review_id,
+        'comment': comment.pk,
+    }
+
+
+def create_admin():
+    """
+    Временный администратор для прогона. Создаётся в транзакции
+    команды и исчезает при её откате; существующие пользователи
+    не меняются.
+    """
+    username = f'{BENCHMARK_PREFIX}admin{uuid4().hex[:12]}'
+    return User.objects.create(
+        username=username, email=f'{username}@yamdb.fake',
+        role=User.ADMIN, confirmation_code=CONFIRMATION_CODE
+    )
+
+
+def admin_client(admin):
+    """
+    Клиент API с JWT-токеном администратора admin.
+    """
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+    )
+    return client
+
+
+def run_benchmark(seeded, repeat=20):
+    """
+    Прогоняет все эндпоинты от имени администратора без ограничений
+    частоты и без кеша ответов. Ответ не из 2xx прерывает замеры
+    BenchmarkError.
+    """
+    admin = create_admin()
+    seeded = dict(seeded, user=admin)
+    client = admin_client(admin)
+    with unthrottled(), uncached():
+        return {
+            name: measure_endpoint(client, method, url, data, repeat)
+            for name, method, url, data in collect_endpoints(seeded)
+        }
+
+
+JSON_CODECS = {
+    'json': (JSONRenderer, JSONParser),
+    'fast': (FastJSONRenderer, FastJSONParser),
+}
+
+
+def serialization_payloads(titles, reviews):
+    """
+    Данные ответов TitleGETSerializer и ReviewSerializer для первых
+    titles произведений и reviews отзывов.
+    """
+    return {
+        'titles': TitleGETSerializer(
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ).order_by('pk')[:titles],
+            many=True
+        ).data,
+        'reviews': ReviewSerializer(
+            Review.objects.select_related('author').order_by('pk')[:reviews],
+            many=True
+        ).data,
+    }
+
+
+def measure_json(payloads, repeat=20):
+    """
+    Сравнивает кодирование и разбор данных payloads стандартным json
+    и FastJSONRenderer/FastJSONParser: медианное время в миллисекундах,
+    элементов в секунду при кодировании, размер ответа и совпадение
+    вывода с JSONRenderer.
+    """
+    results = {}
+    for payload, data in payloads.items():
+        expected = JSONRenderer().render(data)
+        for codec, (renderer_class, parser_class) in JSON_CODECS.items():
+            renderer = renderer_class()
+            parser = parser_class()
+            render_timings = []
+            parse_timings = []
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                content = renderer.render(data)
+                render_timings.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                parser.parse(BytesIO(content))
+                parse_timings.append((time.perf_counter() - started) * 1000)
+            render_ms = _percentile(render_timings, 50)
+            results[f'{payload}-{codec}'] = {
+                'items': len(data),
+                'bytes': len(content),
+                'render_ms': round(render_ms, 3),
+                'parse_ms': round(_percentile(parse_timings, 50), 3),
+                'items_per_s': round(len(data) / max(render_ms, 1e-6) * 1000),
+                'identical': content == expected,
+            }
+    return results
+
+
+def explain_sql(sql):
+    """
+    Возвращает строки плана выполнения запроса.
+    """
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else (
+        'EXPLAIN '
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def sequential_scans(plan):
+    """
+    Отбирает из плана полные просмотры таблиц: SCAN без индекса
+    в SQLite и Seq Scan в PostgreSQL.
+    """
+    return [
+        line.strip() for line in plan
+        if 'Seq Scan' in line
+        or (line.lstrip().startswith('SCAN') and 'USING' not in line)
+    ]
+
+
+def explain_endpoints(seeded):
+    """
+    Выполняет все эндпоинты, перехватывает их SELECT-запросы
+    и возвращает для каждого эндпоинта пары (запрос, план).
+    Ответ не из 2xx прерывает проверку BenchmarkError.
+    """
+    admin = create_admin()
+    seeded = dict(seeded, user=admin)
+    client = admin_client(admin)
+    plans = {}
+    with unthrottled():
+        for name, method, url, data in collect_endpoints(seeded):
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                perform(client, method, url, data)
+            selects = [
+                query['sql'] for query in queries.captured_queries
+                if query['sql'].lstrip().upper().startswith('SELECT')
+            ]
+            plans[name] = [(sql, explain_sql(sql)) for sql in selects]
+    return plans
+
+
+def check_budget(results, budget, overrides=None):
+    """
+    Возвращает список нарушений бюджета вида (эндпоинт, метрика,
+    значение, лимит).
+    """
+    overrides = overrides or {}
+    violations = []
+    for name, metrics in results.items():
+        limits = dict(budget, **overrides.get(name, {}))
+        for metric, limit in limits.items():
+            if limit is not None and metrics.get(metric, 0) > limit:
+                violations.append((name, metric, metrics[metric], limit))
+    return violations
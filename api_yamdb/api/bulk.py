@@ -0,0 +1,325 @@
+from django.db import IntegrityError, connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from api_yamdb.settings import BULK_MAX_ITEMS
+from reviews.signals import bulk_changed
+from .fields import forget_slugs, prefetch_slugs
+
+
+def bulk_insert(model, objects):
+    """
+    bulk_create, после которого у объектов заполнены первичные ключи.
+    Вызывается внутри транзакции.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+    if connection.vendor != 'sqlite':
+        for obj in objects:
+            obj.save(force_insert=True)
+        return objects
+    model.objects.bulk_create(objects)
+    # SQLite не возвращает ключи из массовой вставки. Транзакция держит
+    # блокировку записи, поэтому других вставок между нашими нет,
+    # а AUTOINCREMENT выдаёт ключи по возрастанию в порядке строк.
+    pks = list(
+        model.objects.order_by('-pk').values_list('pk', flat=True)
+        [:len(objects)]
+    )
+    for obj, pk in zip(objects, reversed(pks)):
+        obj.pk = pk
+    return objects
+
+
+def bulk_status(results, success, response=None):
+    """
+    Код ответа: response (по умолчанию success), если все элементы
+    обработаны, 207 при частичном успехе и 400, если не обработан
+    ни один.
+    """
+    succeeded = sum(result['status'] == success for result in results)
+    if succeeded == len(results):
+        return response or success
+    if succeeded:
+        return status.HTTP_207_MULTI_STATUS
+    return status.HTTP_400_BAD_REQUEST
+
+
+class BulkMixin:
+    """
+    Эндпоинт bulk/<ресурс>/ для пакетного создания (POST), изменения (PATCH,
+    элементы с id) и удаления (DELETE, список значений lookup_field).
+    Элементы проверяются по отдельности, корректные записываются
+    в одной транзакции массовыми запросами. В ответе результат
+    для каждого элемента в порядке запроса.
+    """
+    bulk_methods = ('post', 'patch', 'delete')
+    bulk_read_serializer_class = None
+
+    def get_bulk_read_serializer_class(self):
+        return self.bulk_read_serializer_class or self.serializer_class
+
+    def bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Ожидается непустой список.')
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError(
+                f'За один запрос можно передать не больше '
+                f'{BULK_MAX_ITEMS} элементов.'
+            )
+        return items
+
+    @classmethod
+    def as_bulk_view(cls, **initkwargs):
+        """
+        Представление пакетных операций. Оно подключается отдельным
+        маршрутом вне префикса ресурса: путь <ресурс>/bulk/ совпал бы
+        с адресом объекта со слагом «bulk».
+        """
+        return cls.as_view(
+            dict.fromkeys(cls.bulk_methods, 'bulk'), detail=False,
+            **initkwargs
+        )
+
+    def bulk(self, request):
+        items = self.bulk_items(request)
+        handler = getattr(self, f'bulk_{request.method.lower()}')
+        try:
+            return handler(request, items)
+        except IntegrityError:
+            # Слаг из SlugMap мог быть удалён в другом процессе:
+            # элементы проверяются заново по базе.
+            if not forget_slugs(self.get_serializer()):
+                raise
+        return handler(request, items)
+
+    def bulk_serializers(self, items, instances=None):
+        """
+        Сериализаторы элементов с общим контекстом. Слаги всех
+        элементов заранее разрешаются одним запросом на модель.
+        """
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        prefetch_slugs(serializer_class(context=context), items)
+        return [
+            serializer_class(
+                instance, data=item, partial=instance is not None,
+                context=context
+            )
+            for item, instance in zip(
+                items, instances or [None] * len(items)
+            )
+        ]
+
+    def unique_fields(self):
+        model = self.get_queryset().model
+        return [
+            field.name for field in model._meta.concrete_fields
+            if field.unique and not field.primary_key
+        ]
+
+    def validate_bulk(self, serializers):
+        """
+        Проверяет элементы и возвращает ошибки каждого (None, если их
+        нет). Уникальность полей проверяется одним запросом на поле
+        для всех элементов, включая повторы внутри запроса.
+        """
+        model = self.get_queryset().model
+        unique = self.unique_fields()
+        for serializer in serializers:
+            for name in unique:
+                if name in serializer.fields:
+                    field = serializer.fields[name]
+                    field.validators = [
+                        validator for validator in field.validators
+                        if not isinstance(validator, UniqueValidator)
+                    ]
+        errors = [
+            None if serializer.is_valid() else serializer.errors
+            for serializer in serializers
+        ]
+        for name in unique:
+            checked = [
+                (index, serializer.validated_data[name])
+                for index, serializer in enumerate(serializers)
+                if errors[index] is None
+                and name in serializer.validated_data
+            ]
+            owners = dict(
+                model.objects.filter(
+                    **{f'{name}__in': {value for _, value in checked}}
+                ).values_list(name, 'pk')
+            ) if checked else {}
+            for index, value in checked:
+                instance = serializers[index].instance
+                # Новый объект занимает значение своим номером в запросе.
+                claimant = instance.pk if instance else ('new', index)
+                if owners.setdefault(value, claimant) != claimant:
+                    errors[index] = {name: [UniqueValidator.message]}
+        return errors
+
+    def split_m2m(self, validated_data):
+        model = self.get_queryset().model
+        return {
+            field.name: validated_data.pop(field.name)
+            for field in model._meta.many_to_many
+            if field.name in validated_data
+        }
+
+    def write_m2m(self, objects, relations, replace=False):
+        """
+        Записывает связи многие-ко-многим массовыми запросами
+        к промежуточным таблицам.
+        """
+        model = self.get_queryset().model
+        for field in model._meta.many_to_many:
+            changed = [
+                (obj, relation[field.name])
+                for obj, relation in zip(objects, relations)
+                if field.name in relation
+            ]
+            if not changed:
+                continue
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            if replace:
+                through.objects.filter(**{
+                    f'{source}__in': [obj.pk for obj, _ in changed]
+                }).delete()
+            through.objects.bulk_create([
+                through(**{f'{source}_id': obj.pk, f'{target}_id': pk})
+                for obj, related in changed
+                for pk in dict.fromkeys(item.pk for item in related)
+            ])
+
+    def bulk_read(self, pks):
+        objects = self.get_queryset().in_bulk(pks)
+        serializer_class = self.get_bulk_read_serializer_class()
+        return {
+            pk: serializer_class(obj, context=self.get_serializer_context())
+            .data
+            for pk, obj in objects.items()
+        }
+
+    def bulk_results(self, errors, objects, success):
+        """
+        Результаты по элементам: данные записанного объекта или ошибки.
+        """
+        data = self.bulk_read([obj.pk for obj in objects])
+        objects = iter(objects)
+        return [
+            {'status': success, 'data': data[next(objects).pk]}
+            if item_errors is None
+            else {'status': status.HTTP_400_BAD_REQUEST,
+                  'errors': item_errors}
+            for item_errors in errors
+        ]
+
+    def bulk_post(self, request, items):
+        model = self.get_queryset().model
+        serializers = self.bulk_serializers(items)
+        errors = self.validate_bulk(serializers)
+        objects = []
+        relations = []
+        for serializer, item_errors in zip(serializers, errors):
+            if item_errors is None:
+                data = dict(serializer.validated_data)
+                relations.append(self.split_m2m(data))
+                objects.append(model(**data))
+        if objects:
+            with transaction.atomic():
+                bulk_insert(model, objects)
+                self.write_m2m(objects, relations)
+                bulk_changed.send(
+                    sender=model, pks=[obj.pk for obj in objects]
+                )
+        results = self.bulk_results(errors, objects, status.HTTP_201_CREATED)
+        return Response(
+            results, status=bulk_status(results, status.HTTP_201_CREATED)
+        )
+
+    def bulk_patch(self, request, items):
+        model = self.get_queryset().model
+        ids = [item.get('id') if isinstance(item, dict) else None
+               for item in items]
+        instances = self.get_queryset().in_bulk([
+            pk for pk in ids
+            if isinstance(pk, int) and not isinstance(pk, bool)
+        ])
+        missing = {}
+        seen = set()
+        for index, pk in enumerate(ids):
+            if pk not in instances:
+                missing[index] = {'status': status.HTTP_404_NOT_FOUND,
+                                  'id': pk}
+            elif pk in seen:
+                missing[index] = {
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'id': ['Объект уже изменён этим запросом.']}
+                }
+            seen.add(pk)
+        checked = [index for index in range(len(items))
+                   if index not in missing]
+        serializers = self.bulk_serializers(
+            [items[index] for index in checked],
+            [instances[ids[index]] for index in checked]
+        )
+        errors = self.validate_bulk(serializers)
+        objects = []
+        relations = []
+        fields = set()
+        for serializer, item_errors in zip(serializers, errors):
+            if item_errors is not None:
+                continue
+            data = dict(serializer.validated_data)
+            relations.append(self.split_m2m(data))
+            for name, value in data.items():
+                setattr(serializer.instance, name, value)
+            fields.update(data)
+            objects.append(serializer.instance)
+        if objects:
+            with transaction.atomic():
+                if fields:
+                    model.objects.bulk_update(objects, fields)
+                self.write_m2m(objects, relations, replace=True)
+                bulk_changed.send(
+                    sender=model, pks=[obj.pk for obj in objects]
+                )
+        results = dict(zip(
+            checked, self.bulk_results(errors, objects, status.HTTP_200_OK)
+        ))
+        results.update(missing)
+        results = [results[index] for index in range(len(items))]
+        return Response(
+            results, status=bulk_status(results, status.HTTP_200_OK)
+        )
+
+    def bulk_delete(self, request, items):
+        lookup = self.lookup_field
+        key = 'id' if lookup == 'pk' else lookup
+        kind = int if lookup == 'pk' else str
+        values = [
+            item for item in items
+            if isinstance(item, kind) and not isinstance(item, bool)
+        ]
+        queryset = self.get_queryset().model.objects.filter(
+            **{f'{lookup}__in': values}
+        )
+        with transaction.atomic():
+            found = set(queryset.values_list(lookup, flat=True))
+            queryset.delete()
+        results = [
+            {
+                'status': (status.HTTP_204_NO_CONTENT if item in found
+                           else status.HTTP_404_NOT_FOUND),
+                key: item
+            }
+            for item in items
+        ]
+        return Response(results, status=bulk_status(
+            results, status.HTTP_204_NO_CONTENT, status.HTTP_200_OK
+        ))
@@ -0,0 +1,147 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+KEY_PREFIX = 'api-cache'
+
+NAMESPACES = ('categories', 'genres', 'titles')
+
+
+def _settings():
+    return settings.API_RESPONSE_CACHE
+
+
+def get_cache():
+    return caches[_settings()['ALIAS']]
+
+
+def scoped(namespace, key):
+    """
+    Пространство имён данных одного родительского объекта,
+    например отзывов к произведению.
+    """
+    return f'{namespace}:{key}'
+
+
+def _new_version():
+    return uuid4().hex
+
+
+def versions(*namespaces):
+    """
+    Версии пространств имён. Версия входит в ключи ответов: смена
+    версии делает недоступными все закешированные ответы пространства.
+    """
+    cache = get_cache()
+    keys = [f'{KEY_PREFIX}:version:{namespace}' for namespace in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _new_version(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    get_cache().set_many({
+        f'{KEY_PREFIX}:version:{namespace}': _new_version()
+        for namespace in namespaces
+    }, None)
+
+
+def _count(namespace, event):
+    key = f'{KEY_PREFIX}:stats:{namespace}:{event}'
+    cache = get_cache()
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def stats():
+    """
+    Счётчики попаданий и промахов по пространствам имён.
+    """
+    cache = get_cache()
+    result = {}
+    for namespace in NAMESPACES:
+        hits = cache.get(f'{KEY_PREFIX}:stats:{namespace}:hit', 0)
+        misses = cache.get(f'{KEY_PREFIX}:stats:{namespace}:miss', 0)
+        total = hits + misses
+        result[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+    return result
+
+
+def normalized_path(request):
+    """
+    Путь запроса с параметрами в порядке сортировки.
+    """
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    return f'{request.path}?{query}'
+
+
+def response_key(namespace, request):
+    version, = versions(namespace)
+    return f'{KEY_PREFIX}:{namespace}:{version}:{normalized_path(request)}'
+
+
+def cached_response(namespace, request, handler):
+    """
+    Возвращает закешированные данные ответа или вызывает handler
+    и кеширует успешный ответ. Кешируются данные до рендеринга,
+    поэтому согласование формата ответа продолжает работать.
+    """
+    if not _settings()['ENABLED']:
+        return handler()
+    cache = get_cache()
+    key = response_key(namespace, request)
+    data = cache.get(key)
+    if data is not None:
+        _count(namespace, 'hit')
+        response = Response(data, status=status.HTTP_200_OK)
+        response['X-Cache'] = 'HIT'
+        return response
+    _count(namespace, 'miss')
+    response = handler()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, _settings()['TIMEOUT'])
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedListMixin:
+    """
+    Кеширует ответы list в пространстве имён cache_namespace.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            self.cache_namespace, request,
+            lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+
+class CachedRetrieveMixin:
+    """
+    Кеширует ответы retrieve в пространстве имён cache_namespace.
+    """
+    cache_namespace = None
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            self.cache_namespace, request,
+            lambda: super(CachedRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
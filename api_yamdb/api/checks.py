@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def shared_caches():
+    """
+    Кеши, через которые процессы согласуют данные: версии ответов
+    и ETag, версии токенов и счётчики ограничений частоты.
+    """
+    return {
+        'API_RESPONSE_CACHE': settings.API_RESPONSE_CACHE['ALIAS'],
+        'AUTH_USER_CACHE': settings.AUTH_USER_CACHE['ALIAS'],
+        'DEFAULT_THROTTLE_RATES': 'default',
+    }
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Без DEBUG эти кеши должны быть общими для всех процессов: иначе
+    изменение, сделанное в одном процессе, не видно в остальных,
+    и они отдают устаревшие ответы и 304.
+    """
+    if settings.DEBUG:
+        return []
+    return [
+        Error(
+            f'Кеш «{alias}» ({setting}) хранится в памяти процесса.',
+            hint='Укажите в CACHES общий кеш, например Redis или Memcached.',
+            id='api.E001',
+        )
+        for setting, alias in shared_caches().items()
+        if settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_BACKENDS
+    ]
@@ -0,0 +1,78 @@
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import status
+
+from .cache import normalized_path, versions
+
+
+def validator(request, namespaces, vary=''):
+    """
+    Возвращает ETag ответа, вычисленный по версиям пространств имён
+    без обращения к базе и без сериализации тела ответа. Версии
+    случайны, поэтому изменение в ту же секунду, что и предыдущее
+    чтение, тоже меняет ETag; Last-Modified с точностью до секунды
+    этого не гарантирует и не отправляется.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    fingerprint = '|'.join((
+        normalized_path(request),
+        getattr(renderer, 'format', ''),
+        str(vary),
+        *versions(*namespaces),
+    ))
+    return quote_etag(md5(fingerprint.encode()).hexdigest())
+
+
+def conditional_response(request, namespaces, handler, vary=''):
+    """
+    Отвечает 304 Not Modified, если If-None-Match совпадает с текущими
+    версиями данных, иначе вызывает handler и добавляет к успешному
+    ответу заголовок ETag.
+    """
+    etag = validator(request, namespaces, vary)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+    response = handler()
+    if response.status_code == status.HTTP_200_OK:
+        response['ETag'] = etag
+    return response
+
+
+class VersionNamespacesMixin:
+    """
+    Пространства имён, от версий которых зависит ответ представления.
+    """
+
+    def get_version_namespaces(self):
+        return (self.cache_namespace,)
+
+
+class ConditionalListMixin(VersionNamespacesMixin):
+    """
+    Условные GET-запросы для list.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_version_namespaces(),
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+
+class ConditionalRetrieveMixin(VersionNamespacesMixin):
+    """
+    Условные GET-запросы для retrieve.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_version_namespaces(),
+            lambda: super(ConditionalRetrieveMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+        )
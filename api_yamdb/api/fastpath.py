@@ -0,0 +1,261 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import (
+    ManyRelatedField,
+    PKOnlyObject,
+    PrimaryKeyRelatedField,
+    RelatedField,
+    SlugRelatedField
+)
+from rest_framework.response import Response
+
+from .sparse import sparse_params
+
+
+def _scalar(key, to_representation):
+    def get(row, related):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return get
+
+
+def _slug(key):
+    def get(row, related):
+        return row[key]
+    return get
+
+
+def _primary_key(key, to_representation):
+    def get(row, related):
+        value = row[key]
+        return None if value is None else to_representation(
+            PKOnlyObject(pk=value)
+        )
+    return get
+
+
+def _nested(key, getters):
+    def get(row, related):
+        if row[key] is None:
+            return None
+        return {name: getter(row, related) for name, getter in getters}
+    return get
+
+
+def _many(name, pk):
+    def get(row, related):
+        return related[name].get(row[pk], [])
+    return get
+
+
+def compile_column(field, model_field, prefix=''):
+    """
+    Столбец и функция чтения для поля field, которое выводит
+    поле модели model_field без связей; None для других полей.
+    """
+    if (isinstance(field, (
+            RelatedField, ManyRelatedField, serializers.BaseSerializer))
+            or model_field.is_relation or not model_field.concrete):
+        return None
+    key = prefix + field.source
+    return [key], _scalar(key, field.to_representation)
+
+
+def compile_scalars(serializer, model, prefix=''):
+    """
+    Столбцы и функции чтения для полей serializer, которые выводят
+    поля model без связей; None, если есть другие поля.
+    """
+    columns = []
+    getters = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        compiled = compile_column(field, model_field, prefix)
+        if compiled is None:
+            return None
+        columns.extend(compiled[0])
+        getters.append((name, compiled[1]))
+    return columns, getters
+
+
+def compile_item(field, model):
+    """
+    Столбцы model и функция, которая строит элемент поля
+    «многие-ко-многим» из строки values(); None для других полей.
+    """
+    if isinstance(field, ManyRelatedField):
+        child = field.child_relation
+        if isinstance(child, SlugRelatedField):
+            return [child.slug_field], _slug(child.slug_field)
+        if isinstance(child, PrimaryKeyRelatedField):
+            return ['pk'], _primary_key('pk', child.to_representation)
+        return None
+    if isinstance(field, serializers.ListSerializer):
+        compiled = compile_scalars(field.child, model)
+        if compiled is None:
+            return None
+        columns, getters = compiled
+        return columns, lambda row, related: {
+            name: getter(row, related) for name, getter in getters
+        }
+    return None
+
+
+def compile_foreign_key(field, model_field):
+    """
+    Столбцы и функция чтения для поля field, которое выводит
+    внешний ключ model_field; None для других полей.
+    """
+    if not model_field.many_to_one:
+        return None
+    if isinstance(field, SlugRelatedField):
+        key = f'{field.source}__{field.slug_field}'
+        return [key], _slug(key)
+    if isinstance(field, PrimaryKeyRelatedField):
+        return [field.source], _primary_key(
+            field.source, field.to_representation
+        )
+    if isinstance(field, serializers.Serializer):
+        compiled = compile_scalars(
+            field, model_field.related_model, f'{field.source}__'
+        )
+        if compiled is None:
+            return None
+        return [field.source, *compiled[0]], _nested(
+            field.source, compiled[1]
+        )
+    return None
+
+
+class ValuesPlan:
+    """
+    Заранее собранный способ вывести данные сериализатора из строк
+    values(): список столбцов и функция чтения для каждого поля.
+    Связи «многие-ко-многим» загружаются одним запросом на страницу.
+    """
+
+    def __init__(self, model, columns, getters, relations):
+        self.model = model
+        self.pk = model._meta.pk.name
+        self.columns = list(dict.fromkeys([self.pk, *columns]))
+        self.getters = getters
+        self.relations = relations
+
+    def rows(self, queryset, extra_columns=()):
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys([*self.columns, *extra_columns])
+        )
+
+    def load_related(self, rows):
+        pks = [row[self.pk] for row in rows]
+        related = {}
+        for name, model_field, columns, item in self.relations:
+            query_name = model_field.related_query_name()
+            items = defaultdict(list)
+            if pks:
+                for row in model_field.related_model.objects.filter(**{
+                    f'{query_name}__in': pks
+                }).values(query_name, *columns):
+                    items[row[query_name]].append(item(row, None))
+            related[name] = items
+        return related
+
+    def represent(self, rows):
+        rows = list(rows)
+        related = self.load_related(rows)
+        return [
+            {name: getter(row, related) for name, getter in self.getters}
+            for row in rows
+        ]
+
+
+def compile_plan(serializer, model):
+    """
+    Собирает ValuesPlan для serializer; None, если какое-то поле
+    нельзя вывести из values() так же, как это делает сериализатор.
+    """
+    opts = model._meta
+    columns = []
+    getters = []
+    relations = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many:
+            compiled = compile_item(field, model_field.related_model)
+            if compiled is None:
+                return None
+            relations.append((name, model_field, *compiled))
+            getters.append((name, _many(name, opts.pk.name)))
+        else:
+            compile_field = (
+                compile_foreign_key if model_field.is_relation
+                else compile_column
+            )
+            compiled = compile_field(field, model_field)
+            if compiled is None:
+                return None
+            columns.extend(compiled[0])
+            getters.append((name, compiled[1]))
+    return ValuesPlan(model, columns, getters, relations)
+
+
+plans = {}
+
+
+def values_plan(serializer_class, request):
+    """
+    ValuesPlan для serializer_class с учётом ?fields и ?expand,
+    собранный один раз на набор параметров.
+    """
+    fields, expand = sparse_params(request)
+    key = (
+        serializer_class,
+        frozenset(fields) if fields else None,
+        frozenset(expand) if expand else None
+    )
+    if key not in plans:
+        serializer = serializer_class(context={'request': request})
+        plan = compile_plan(serializer, serializer_class.Meta.model)
+        # План хранит поля сериализатора, но не должен держать запрос,
+        # по которому был собран.
+        serializer._context = {}
+        plans[key] = plan
+    return plans[key]
+
+
+class ValuesListMixin:
+    """
+    Список строится из строк values() по заранее собранному плану
+    сериализатора, без экземпляров моделей и обхода полей на каждый
+    объект. Вывод совпадает с сериализатором; если план собрать нельзя,
+    используется обычный list. values_columns — дополнительные столбцы
+    для пагинации.
+    """
+    values_read = True
+    values_columns = ()
+
+    def list(self, request, *args, **kwargs):
+        plan = values_plan(
+            self.get_serializer_class(), request
+        ) if self.values_read else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        rows = plan.rows(
+            self.filter_queryset(self.get_queryset()), self.values_columns
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.represent(page))
+        return Response(plan.represent(rows))
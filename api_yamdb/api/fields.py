@@ -0,0 +1,193 @@
+import threading
+
+from django.db import IntegrityError, transaction
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from .cache import versions
+
+# Наибольшее число слагов в отображении одной модели; при переполнении
+# отображение очищается и заполняется заново.
+SLUG_MAP_MAX_SIZE = 10000
+
+
+class SlugMap:
+    """
+    Отображение слаг → id одной модели в памяти процесса. Неизвестные
+    слаги загружаются одним запросом на вызов; отображение очищается
+    при смене версии пространства имён, которую сигналы меняют при
+    изменении объектов модели.
+    """
+
+    def __init__(self, model, slug_field, namespace):
+        self.model = model
+        self.slug_field = slug_field
+        self.namespace = namespace
+        self.ids = {}
+        self.version = None
+        self.lock = threading.Lock()
+
+    def resolve(self, slugs):
+        """
+        id найденных слагов из slugs; отсутствующих в базе в ответе нет.
+        """
+        # Версия читается до запроса к базе: данные, загруженные
+        # одновременно с изменением, сбросятся при следующей проверке.
+        version, = versions(self.namespace)
+        with self.lock:
+            if version != self.version or len(self.ids) > SLUG_MAP_MAX_SIZE:
+                self.ids = {}
+                self.version = version
+            known = {slug: self.ids[slug] for slug in slugs
+                     if slug in self.ids}
+        missing = set(slugs) - known.keys()
+        if missing:
+            found = dict(
+                self.model.objects.filter(
+                    **{f'{self.slug_field}__in': missing}
+                ).values_list(self.slug_field, 'pk')
+            )
+            known.update(found)
+            with self.lock:
+                if version == self.version:
+                    self.ids.update(found)
+        return known
+
+    def forget(self):
+        with self.lock:
+            self.ids = {}
+
+
+slug_maps = {}
+
+
+def get_slug_map(model, slug_field, namespace):
+    key = (model, slug_field)
+    if key not in slug_maps:
+        slug_maps[key] = SlugMap(model, slug_field, namespace)
+    return slug_maps[key]
+
+
+class CachedSlugManyRelatedField(ManyRelatedField):
+    """
+    Список слагов, который разрешается одним обращением к SlugMap.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.to_internal_values(data)
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который находит id по слагу через SlugMap и
+    возвращает объект с загруженными id и слагом; остальные поля
+    загружаются при первом обращении. namespace — пространство имён
+    кеша, версия которого меняется при изменении объектов модели.
+    """
+
+    def __init__(self, namespace=None, **kwargs):
+        assert namespace is not None, 'The `namespace` argument is required.'
+        self.namespace = namespace
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return CachedSlugManyRelatedField(**list_kwargs)
+
+    def get_slug_map(self):
+        return get_slug_map(
+            self.get_queryset().model, self.slug_field, self.namespace
+        )
+
+    def to_internal_values(self, data):
+        slugs = []
+        for value in data:
+            if isinstance(value, (dict, list, bool)) or value is None:
+                self.fail('invalid')
+            slugs.append(smart_str(value))
+        ids = self.get_slug_map().resolve(slugs)
+        model = self.get_queryset().model
+        objects = []
+        for slug in slugs:
+            if slug not in ids:
+                self.fail(
+                    'does_not_exist', slug_name=self.slug_field, value=slug
+                )
+            objects.append(model.from_db(
+                model.objects.db, (model._meta.pk.attname, self.slug_field),
+                (ids[slug], slug)
+            ))
+        return objects
+
+    def to_internal_value(self, data):
+        return self.to_internal_values([data])[0]
+
+
+def slug_relations(serializer):
+    """
+    Поля сериализатора со слагами: имя поля → (поле, many).
+    """
+    relations = {}
+    for name, field in serializer.fields.items():
+        many = isinstance(field, ManyRelatedField)
+        relation = field.child_relation if many else field
+        if isinstance(relation, CachedSlugRelatedField):
+            relations[name] = (relation, many)
+    return relations
+
+
+def forget_slugs(serializer):
+    """
+    Очищает отображения слагов полей serializer. Возвращает False,
+    если таких полей нет.
+    """
+    relations = slug_relations(serializer)
+    for relation, _ in relations.values():
+        relation.get_slug_map().forget()
+    return bool(relations)
+
+
+class SlugRevalidationMixin:
+    """
+    Сохранение с проверкой слагов по базе при нарушении внешнего ключа.
+    Объект, id которого взят из SlugMap, мог быть удалён в другом
+    процессе до сброса версии; тогда отображение очищается, данные
+    проверяются заново и удалённый слаг даёт ошибку проверки, а не 500.
+    """
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            if not forget_slugs(self):
+                raise
+        self._validated_data = self.run_validation(self.initial_data)
+        with transaction.atomic():
+            return super().save(**kwargs)
+
+
+def prefetch_slugs(serializer, items):
+    """
+    Загружает в SlugMap слаги всех элементов пакета одним запросом
+    на модель, чтобы проверка элементов не обращалась к базе.
+    """
+    for name, (relation, many) in slug_relations(serializer).items():
+        slugs = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            for slug in (value if many and isinstance(value, list)
+                         else [value]):
+                if isinstance(slug, (str, int)) and not isinstance(
+                        slug, bool):
+                    slugs.add(smart_str(slug))
+        relation.get_slug_map().resolve(slugs)
@@ -1,13 +1,94 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django.db.models import Count, F
+from django_filters.rest_framework import (CharFilter, ChoiceFilter,
+                                           FilterSet)
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.models import Category, Genre, GenreTitle, Title
+
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+
+
+def split_slugs(value):
+    return list(dict.fromkeys(
+        slug.strip() for slug in value.split(',') if slug.strip()
+    ))
+
+
+def resolve_slugs(model, slugs):
+    """
+    Находит id по слагам одним запросом по уникальному индексу слага.
+    """
+    return list(
+        model.objects.filter(slug__in=slugs).order_by().values_list(
+            'id', flat=True
+        )
+    )
 
 
 class TitlesFilter(FilterSet):
+    """
+    Категория и жанры сравниваются со слагом точно; несколько слагов
+    передаются через запятую. Жанры по умолчанию объединяются по ИЛИ,
+    с genre_mode=all произведение должно иметь все жанры.
+    """
     name = CharFilter(field_name='name', lookup_expr='contains')
-    category = CharFilter(field_name='category__slug', lookup_expr='contains')
-    genre = CharFilter(field_name='genre__slug', lookup_expr='contains')
+    category = CharFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
+    genre_mode = ChoiceFilter(
+        choices=((GENRE_MODE_ANY, 'Любой из жанров'),
+                 (GENRE_MODE_ALL, 'Все жанры')),
+        method='filter_genre_mode',
+        empty_label=None
+    )
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year')
+        fields = ('name', 'category', 'genre', 'genre_mode', 'year')
+
+    def filter_category(self, queryset, name, value):
+        slugs = split_slugs(value)
+        if not slugs:
+            return queryset
+        return queryset.filter(
+            category_id__in=resolve_slugs(Category, slugs)
+        )
+
+    def filter_genre(self, queryset, name, value):
+        slugs = split_slugs(value)
+        if not slugs:
+            return queryset
+        genre_ids = resolve_slugs(Genre, slugs)
+        links = GenreTitle.objects.filter(genre_id__in=genre_ids)
+        if self.form.cleaned_data.get('genre_mode') == GENRE_MODE_ALL:
+            if len(genre_ids) < len(slugs):
+                return queryset.none()
+            links = links.values('title_id').annotate(
+                genres=Count('genre_id', distinct=True)
+            ).filter(genres=len(genre_ids))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+
+class NullsLastOrderingFilter(OrderingFilter):
+    """
+    Сортировка ?ordering=, при которой произведения без рейтинга
+    оказываются в конце при любом направлении. Последним добавляется
+    id в направлении последнего поля, чтобы порядок страниц был
+    однозначным и совпадал с порядком индекса.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        expressions = [
+            F(field[1:]).desc(nulls_last=True) if field.startswith('-')
+            else F(field).asc(nulls_last=True)
+            for field in ordering
+        ]
+        tiebreaker = '-pk' if ordering[-1].startswith('-') else 'pk'
+        return queryset.order_by(*expressions, tiebreaker)
@@ -0,0 +1,84 @@
+import json
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api.benchmark import (BenchmarkError, check_budget, isolated_caches,
+                           run_benchmark, seed_data)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными, прогоняет все эндпоинты '
+        '/api/v1/ и проверяет задержку, число SQL-запросов и память. '
+        'Все изменения в базе откатываются, кеши на время замеров '
+        'подменяются, кеш ответов отключён.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=10_000)
+        parser.add_argument('--reviews', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=5_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество замеров задержки на эндпоинт.'
+        )
+        parser.add_argument(
+            '--budget', type=json.loads, default=None,
+            help='JSON с лимитами: {"queries": 5, "p95_ms": 200, ...}.'
+        )
+        parser.add_argument(
+            '--budget-file',
+            help='JSON-файл с лимитами для отдельных эндпоинтов.'
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты замеров в JSON-файл.'
+        )
+
+    def handle(self, *args, **options):
+        if options['titles'] < 1:
+            raise CommandError('Нужно хотя бы одно произведение.')
+        budget = dict(settings.BENCHMARK_BUDGET, **(options['budget'] or {}))
+        overrides = {}
+        if options['budget_file']:
+            with open(options['budget_file'], encoding='utf8') as file:
+                overrides = json.load(file)
+
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+        ), isolated_caches(), transaction.atomic():
+            seeded = seed_data(
+                options['titles'],
+                options['reviews'],
+                options['comments'],
+                batch_size=options['batch_size']
+            )
+            try:
+                results = run_benchmark(seeded, repeat=options['repeat'])
+            except BenchmarkError as error:
+                raise CommandError(f'Эндпоинт ответил ошибкой: {error}')
+            finally:
+                transaction.set_rollback(True)
+
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:<20} status={metrics["status"]} '
+                f'p50={metrics["p50_ms"]}ms p95={metrics["p95_ms"]}ms '
+                f'queries={metrics["queries"]} '
+                f'peak={metrics["peak_memory_kb"]}KiB'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf8') as file:
+                json.dump(results, file, indent=2)
+
+        violations = check_budget(results, budget, overrides)
+        for name, metric, value, limit in violations:
+            self.stderr.write(f'{name}: {metric}={value} > {limit}')
+        if violations:
+            raise CommandError(
+                f'Превышен бюджет производительности: {len(violations)}'
+            )
+        self.stdout.write(self.style.SUCCESS('Бюджет не превышен.'))
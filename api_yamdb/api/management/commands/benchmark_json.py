@@ -0,0 +1,55 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from api.benchmark import measure_json, seed_data, serialization_payloads
+from api.renderers import orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость кодирования и разбора JSON ответов '
+        'TitleGETSerializer и ReviewSerializer стандартным json '
+        'и FastJSONRenderer/FastJSONParser на синтетических данных. '
+        'Все изменения в базе откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=1000)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество замеров на каждый вариант.'
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты замеров в JSON-файл.'
+        )
+
+    def handle(self, *args, **options):
+        if options['titles'] < 1:
+            raise CommandError('Нужно хотя бы одно произведение.')
+        with transaction.atomic():
+            seed_data(options['titles'], options['reviews'], 0)
+            payloads = serialization_payloads(
+                options['titles'], options['reviews']
+            )
+            transaction.set_rollback(True)
+        results = measure_json(payloads, repeat=options['repeat'])
+
+        if orjson is None:
+            self.stdout.write(
+                'orjson не установлен, fast использует стандартный json.'
+            )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:<16} items={metrics["items"]} '
+                f'bytes={metrics["bytes"]} '
+                f'render={metrics["render_ms"]}ms '
+                f'parse={metrics["parse_ms"]}ms '
+                f'items/s={metrics["items_per_s"]} '
+                f'identical={metrics["identical"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf8') as file:
+                json.dump(results, file, indent=2)
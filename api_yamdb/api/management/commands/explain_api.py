@@ -0,0 +1,74 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api.benchmark import (BenchmarkError, existing_objects,
+                           explain_endpoints, isolated_caches, seed_data,
+                           sequential_scans)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN для запросов каждого эндпоинта /api/v1/ '
+        'и сообщает о полных просмотрах таблиц. Изменения в базе '
+        'откатываются, кеши на время проверки подменяются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            action='store_true',
+            help='Заполнить базу синтетическими данными перед проверкой.'
+        )
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument('--reviews', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=1000)
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Печатать запросы и планы целиком.'
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Завершиться с ошибкой, если найдены полные просмотры.'
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+        ), isolated_caches(), transaction.atomic():
+            seeded = None if options['seed'] else existing_objects()
+            if seeded is None:
+                seeded = seed_data(
+                    options['titles'], options['reviews'],
+                    options['comments']
+                )
+            try:
+                plans = explain_endpoints(seeded)
+            except BenchmarkError as error:
+                raise CommandError(f'Эндпоинт ответил ошибкой: {error}')
+            finally:
+                transaction.set_rollback(True)
+
+        found = 0
+        for name, queries in plans.items():
+            scans = [
+                (sql, scan) for sql, plan in queries
+                for scan in sequential_scans(plan)
+            ]
+            found += len(scans)
+            status = (
+                self.style.WARNING(f'полных просмотров: {len(scans)}')
+                if scans else self.style.SUCCESS('OK')
+            )
+            self.stdout.write(f'{name:<20} запросов={len(queries)} {status}')
+            for sql, scan in scans:
+                self.stdout.write(f'    {scan}: {sql[:200]}')
+            if options['verbose_plans']:
+                for sql, plan in queries:
+                    self.stdout.write(f'    {sql}')
+                    for line in plan:
+                        self.stdout.write(f'        {line}')
+        if found and options['strict']:
+            raise CommandError(f'Найдено полных просмотров: {found}')
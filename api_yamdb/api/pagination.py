@@ -0,0 +1,143 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def cursor_value(obj, name):
+    """
+    Значение ключа пагинации у объекта модели или строки values().
+    """
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по паре (pub_date, id) от новых к старым.
+    Следующая страница выбирается условием по ключу последней записи,
+    поэтому глубокие страницы не дороже первой и не требуют COUNT(*).
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering = ('-pub_date', '-id')
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def encode_cursor(self, obj, reverse):
+        position = {
+            'pub_date': cursor_value(obj, 'pub_date').isoformat(),
+            'id': cursor_value(obj, 'id'),
+            'reverse': reverse,
+        }
+        return urlsafe_b64encode(
+            json.dumps(position).encode()
+        ).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode()))
+            pub_date = parse_datetime(position['pub_date'])
+            if pub_date is None:
+                raise ValueError
+            return pub_date, int(position['id']), bool(position['reverse'])
+        except (BinasciiError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[2]
+        if cursor is not None:
+            pub_date, pk, _ = cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                )
+        if reverse:
+            queryset = queryset.order_by('pub_date', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+        self.page = page
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1], reverse=False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[0], reverse=True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    Постраничная пагинация по умолчанию для обратной совместимости;
+    курсорная включается параметром ?pagination=cursor
+    или передачей курсора.
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def __init__(self):
+        self.page_number = PageNumberPagination()
+        self.keyset = KeysetPagination()
+        self.active = self.page_number
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.active, 'display_page_controls', False)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (
+            params.get(self.mode_query_param) == self.keyset_mode
+            or self.keyset.cursor_query_param in params
+        ):
+            self.active = self.keyset
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def to_html(self):
+        return self.active.to_html()
@@ -1,19 +1,21 @@
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from django.conf import settings
-from django.core.mail import send_mail
 from django.core.validators import MaxValueValidator, MinValueValidator
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from reviews.models import Category, Comment, Genre, Review, Title
+from users.outbox import enqueue_email
 from users.validators import validate_username
 from api_yamdb.settings import (
     MIN_SCORE_VALIDATOR,
     MAX_SCORE_VALIDATOR,
     USER_INFO_MAX_LENGTH
 )
+from .authentication import token_for
+from .fields import CachedSlugRelatedField, SlugRevalidationMixin
+from .sparse import SparseFieldsMixin
 from .utils import generate_confirmation_code
 
 
@@ -34,15 +36,17 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
+class TitleSerializer(SlugRevalidationMixin, serializers.ModelSerializer):
+    genre = CachedSlugRelatedField(
         slug_field='slug',
         queryset=Genre.objects.all(),
+        namespace='genres',
         many=True
     )
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
         slug_field='slug',
-        queryset=Category.objects.all()
+        queryset=Category.objects.all(),
+        namespace='categories'
     )
 
     class Meta:
@@ -57,7 +61,8 @@ class TitleSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleGETSerializer(serializers.ModelSerializer):
+class TitleGETSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'genre': 'slug', 'category': 'slug'}
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.FloatField(read_only=True)
@@ -75,7 +80,18 @@ class TitleGETSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleRankingSerializer(TitleGETSerializer):
+    weighted_rating = serializers.FloatField(read_only=True)
+    review_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TitleGETSerializer.Meta):
+        fields = TitleGETSerializer.Meta.fields + (
+            'weighted_rating',
+            'review_count'
+        )
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -107,7 +123,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -120,6 +136,15 @@ class CommentSerializer(serializers.ModelSerializer):
         exclude = ('review',)
 
 
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField()
+    review_id = serializers.IntegerField(allow_null=True)
+    rank = serializers.FloatField()
+    snippet = serializers.CharField()
+
+
 class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -158,8 +183,7 @@ class ConfirmationCodeSerializer(serializers.Serializer):
         user.is_active = True
         user.save()
 
-        token = str(RefreshToken.for_user(user).access_token)
-        return {'token': token}
+        return {'token': str(token_for(user))}
 
 
 class SignUpSerializer(serializers.Serializer):
@@ -181,16 +205,17 @@ class SignUpSerializer(serializers.Serializer):
         email = self.validated_data['email']
         username = self.validated_data['username']
 
-        user, created = User.objects.get_or_create(
-            email=email,
-            defaults={'username': username}
-        )
+        with transaction.atomic():
+            user, created = User.objects.get_or_create(
+                email=email,
+                defaults={'username': username}
+            )
 
-        if not created:
-            user.confirmation_code = generate_confirmation_code(user)
-            user.save()
+            if not created:
+                user.confirmation_code = generate_confirmation_code(user)
+                user.save()
 
-        self.send_confirmation_email(user)
+            self.send_confirmation_email(user)
 
         return user
 
@@ -202,12 +227,10 @@ class SignUpSerializer(serializers.Serializer):
             f'Если вы не отправляли этот запрос, '
             f'просто проигнорируйте это сообщение.'
         )
-        send_mail(
+        enqueue_email(
             subject='Код подтверждения',
-            message=confirmation_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
+            body=confirmation_message,
+            recipients=[user.email]
         )
 
     def validate(self, data):
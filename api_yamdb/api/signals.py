@@ -0,0 +1,135 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save
+)
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.signals import bulk_changed
+from .authentication import forget_principal
+from .cache import invalidate, scoped
+
+User = get_user_model()
+
+INVALIDATED_NAMESPACES = {
+    Category: ('categories', 'titles', 'autocomplete'),
+    Genre: ('genres', 'titles', 'autocomplete'),
+    Title: ('titles', 'autocomplete'),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+    User: ('users',),
+}
+
+# Отзывы и комментарии версионируются по родительскому объекту,
+# страница произведения — по самому произведению: пространство имён
+# и поле объекта с ключом родителя.
+SCOPED_NAMESPACES = {
+    Title: (('reviews', 'pk'), ('title', 'pk')),
+    GenreTitle: (('title', 'title_id'),),
+    Review: (('reviews', 'title_id'), ('comments', 'pk'),
+             ('title', 'title_id')),
+    Comment: (('comments', 'review_id'),),
+}
+
+
+def invalidate_on_commit(*namespaces):
+    """
+    Сбрасывает версии после фиксации транзакции, чтобы параллельный
+    запрос не закешировал прежние данные под новой версией.
+    """
+    if namespaces:
+        transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def changed_namespaces(sender, instance=None):
+    """
+    Пространства имён, зависящие от изменённого объекта. Без объекта
+    (массовое изменение) сбрасываются пространства целиком.
+    """
+    namespaces = list(INVALIDATED_NAMESPACES.get(sender, ()))
+    for namespace, field in SCOPED_NAMESPACES.get(sender, ()):
+        if instance is None:
+            namespaces.append(namespace)
+        else:
+            namespaces.append(scoped(namespace, getattr(instance, field)))
+    return namespaces
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_response_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает закешированные ответы, зависящие от изменённой модели.
+    """
+    invalidate_on_commit(*changed_namespaces(sender, instance))
+
+
+@receiver(bulk_changed)
+def invalidate_after_bulk_change(sender, **kwargs):
+    namespaces = changed_namespaces(sender)
+    if sender is User:
+        namespaces += ['reviews', 'comments']
+    invalidate_on_commit(*namespaces)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, reverse, pk_set, **kwargs):
+    """
+    Жанры меняются у одного произведения или, со стороны жанра,
+    у произведений из pk_set; очистка со стороны жанра затрагивает
+    неизвестные произведения.
+    """
+    namespaces = list(INVALIDATED_NAMESPACES[GenreTitle])
+    if not reverse:
+        namespaces.append(scoped('title', instance.pk))
+    elif pk_set is None:
+        namespaces.append('title')
+    else:
+        namespaces.extend(scoped('title', pk) for pk in pk_set)
+    invalidate_on_commit(*namespaces)
+
+
+@receiver(pre_save, sender=Review)
+def invalidate_previous_title_reviews(sender, instance, **kwargs):
+    """
+    Отзыв, перенесённый в другое произведение, пропадает
+    из отзывов прежнего произведения.
+    """
+    title_id = getattr(instance, '_rating_state', (None, None))[0]
+    if title_id is not None and title_id != instance.title_id:
+        invalidate_on_commit(
+            scoped('reviews', title_id), scoped('title', title_id)
+        )
+
+
+@receiver(pre_save, sender=User)
+def invalidate_author_names(sender, instance, **kwargs):
+    """
+    Имя автора выводится в отзывах и комментариях. Если прежнее
+    имя неизвестно, пространства сбрасываются на всякий случай.
+    """
+    if instance.pk is None:
+        return
+    username = getattr(instance, '_loaded_username', None)
+    if username != instance.username:
+        invalidate_on_commit('reviews', 'comments')
+
+
+@receiver(post_save, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.username
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_principal(sender, instance, **kwargs):
+    """
+    Роль и флаги пользователя кешируются для аутентификации.
+    """
+    user_id = getattr(instance, jwt_settings.USER_ID_FIELD)
+    transaction.on_commit(lambda: forget_principal(user_id))
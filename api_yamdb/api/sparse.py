@@ -0,0 +1,141 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def query_list(request, name):
+    """
+    Значения параметра запроса, перечисленные через запятую;
+    None, если параметр не передан или пуст.
+    """
+    items = {
+        item.strip()
+        for item in request.query_params.get(name, '').split(',')
+        if item.strip()
+    }
+    return items or None
+
+
+def sparse_params(request):
+    return query_list(request, FIELDS_PARAM), query_list(request, EXPAND_PARAM)
+
+
+class SparseFieldsMixin:
+    """
+    Сериализатор для чтения, поля которого выбираются параметрами
+    запроса: ?fields=id,name — только перечисленные поля,
+    ?expand=genre — связь вложенными объектами. Связи из expandable_fields
+    (имя поля → поле слага), выбранные через ?fields без ?expand,
+    выводятся слагами. Без ?fields ответ не меняется.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        fields, expand = sparse_params(request)
+        unknown_expand = (expand or set()) - self.expandable_fields.keys()
+        if unknown_expand:
+            raise ValidationError({EXPAND_PARAM: [
+                f'Нельзя раскрыть поля: {", ".join(sorted(unknown_expand))}.'
+            ]})
+        if fields is None:
+            return
+        unknown = fields - self.fields.keys()
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: [
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            ]})
+        selected = fields | (expand or set())
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+        for name, slug_field in self.expandable_fields.items():
+            if name in fields and name not in (expand or set()):
+                self.fields[name] = serializers.SlugRelatedField(
+                    slug_field=slug_field,
+                    read_only=True,
+                    many=isinstance(
+                        self.fields[name], serializers.ListSerializer
+                    )
+                )
+
+
+def related_columns(field):
+    """
+    Столбцы связанной модели, которые выводит поле связи; None —
+    достаточно внешнего ключа.
+    """
+    if isinstance(field, ManyRelatedField):
+        field = field.child_relation
+    elif isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.SlugRelatedField):
+        return [field.slug_field]
+    if isinstance(field, serializers.Serializer):
+        return [child.source for child in field.fields.values()]
+    return None
+
+
+def narrow_queryset(queryset, serializer):
+    """
+    Ограничивает queryset столбцами, соединениями и предзагрузкой,
+    которые нужны полям serializer. Если поле не соответствует полю
+    модели, queryset возвращается без изменений.
+    """
+    opts = queryset.model._meta
+    columns = [opts.pk.name]
+    joins = []
+    prefetches = []
+    for field in serializer.fields.values():
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            return queryset
+        related = related_columns(field) if model_field.is_relation else None
+        if model_field.many_to_many:
+            prefetches.append(Prefetch(
+                field.source,
+                queryset=model_field.related_model.objects.only(
+                    *(related or ['pk'])
+                )
+            ))
+        elif model_field.concrete and not model_field.one_to_many:
+            columns.append(field.source)
+            if related is not None:
+                joins.append(field.source)
+                columns.extend(
+                    f'{field.source}__{column}' for column in related
+                )
+        else:
+            return queryset
+    return queryset.select_related(None).prefetch_related(None).select_related(
+        *joins
+    ).prefetch_related(*prefetches).only(*columns)
+
+
+class SparseQuerysetMixin:
+    """
+    Сужает queryset списка и объекта до полей, выбранных ?fields
+    и ?expand, чтобы не загружать лишние столбцы и связи.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        fields, _ = sparse_params(self.request)
+        if fields is None:
+            return queryset
+        serializer = self.get_serializer_class()(
+            context={'request': self.request, 'view': self}
+        )
+        return narrow_queryset(queryset, serializer)
@@ -0,0 +1,131 @@
+import math
+from hashlib import md5
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты по скользящему окну. В кеше хранятся только
+    счётчики текущего и предыдущего окна, а число запросов за последние
+    duration секунд оценивается как счётчик текущего окна плюс доля
+    предыдущего, ещё попадающая в скользящее окно.
+    Частоты задаются в REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+    """
+
+    def get_rate(self):
+        # Настройки читаются при каждом запросе, а не при импорте класса,
+        # чтобы изменение частот применялось без перезапуска.
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        now = self.timer()
+        window = int(now // self.duration)
+        current_key = f'{self.key}:{window}'
+        previous_key = f'{self.key}:{window - 1}'
+        counts = self.cache.get_many((previous_key, current_key))
+        previous = counts.get(previous_key, 0)
+        current = counts.get(current_key, 0)
+        elapsed = now - window * self.duration
+        weight = 1 - elapsed / self.duration
+        if previous * weight + current >= self.num_requests:
+            self.wait_time = self.retry_after(previous, current, elapsed)
+            return self.throttle_failure()
+        if not self.cache.add(current_key, 1, 2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                # Счётчик истёк между add и incr.
+                self.cache.set(current_key, 1, 2 * self.duration)
+        return True
+
+    def retry_after(self, previous, current, elapsed):
+        """
+        Через сколько секунд оценка опустится ниже лимита, если новых
+        запросов не будет.
+        """
+        if current >= self.num_requests:
+            # В следующем окне нынешний счётчик станет предыдущим.
+            wait = (
+                self.duration - elapsed
+                + self.duration * (1 - self.num_requests / current)
+            )
+        else:
+            wait = (
+                self.duration * (1 - (self.num_requests - current) / previous)
+                - elapsed
+            )
+        return max(1, math.ceil(wait))
+
+    def wait(self):
+        return self.wait_time
+
+
+class ScopedIPThrottle(SlidingWindowThrottle):
+    """
+    Лимит запросов с одного адреса, scope задаётся в представлении
+    или подклассе.
+    """
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+
+class ScopedUsernameThrottle(SlidingWindowThrottle):
+    """
+    Лимит запросов для одного username из тела запроса независимо
+    от адреса. Запросы без username этим лимитом не учитываются.
+    """
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': md5(username.casefold().encode()).hexdigest()
+        }
+
+
+class SignUpIPThrottle(ScopedIPThrottle):
+    scope = 'signup_ip'
+
+
+class SignUpUsernameThrottle(ScopedUsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(ScopedIPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(ScopedUsernameThrottle):
+    scope = 'token_username'
+
+
+class UserWriteThrottle(SlidingWindowThrottle):
+    """
+    Лимит изменяющих запросов аутентифицированного пользователя.
+    Чтение и анонимные запросы не ограничиваются.
+    """
+    scope = 'user_write'
+
+    def get_cache_key(self, request, view):
+        if (request.method in SAFE_METHODS
+                or not request.user.is_authenticated):
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': request.user.pk
+        }
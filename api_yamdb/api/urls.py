@@ -1,7 +1,16 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import SignUpView, TokenObtainView, UserViewSet
+from .views import (
+    AutocompleteView,
+    CacheStatsView,
+    EmailQueueStatsView,
+    ExportView,
+    SearchView,
+    SignUpView,
+    TokenObtainView,
+    UserViewSet
+)
 from .views import (
     CategoryViewSet,
     CommentViewSet,
@@ -27,6 +36,18 @@ router.register(
     basename='comments'
 )
 
+bulk_urls = [
+    path(
+        f'{basename}/', viewset.as_bulk_view(basename=basename),
+        name=f'{basename}-bulk'
+    )
+    for basename, viewset in (
+        ('titles', TitleViewSet),
+        ('genres', GenreViewSet),
+        ('categories', CategoryViewSet),
+    )
+]
+
 auth_urls = [
     path(
         'signup/', SignUpView.as_view(), name='sign_up'
@@ -39,5 +60,15 @@ auth_urls = [
 
 urlpatterns = [
     path('v1/auth/', include(auth_urls)),
+    path('v1/bulk/', include(bulk_urls)),
+    path('v1/export/<str:table>/', ExportView.as_view(), name='export'),
+    path('v1/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path(
+        'v1/email-stats/', EmailQueueStatsView.as_view(), name='email_stats'
+    ),
+    path('v1/search/', SearchView.as_view(), name='search'),
+    path(
+        'v1/autocomplete/', AutocompleteView.as_view(), name='autocomplete'
+    ),
     path('v1/', include(router.urls)),
 ]
@@ -1,26 +1,59 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets, status
+from rest_framework import filters, generics, mixins, viewsets, status
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
     AllowAny,
     IsAuthenticated)
 
-from api.filters import TitlesFilter
+from api import autocomplete
+from api.cache import (
+    CachedListMixin,
+    CachedRetrieveMixin,
+    cached_response,
+    scoped,
+    stats
+)
+from api.conditional import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    conditional_response
+)
+from api.filters import NullsLastOrderingFilter, TitlesFilter
+from api.pagination import PageNumberOrKeysetPagination
+from reviews.csv_export import EXPORT_FORMATS
+from reviews.csv_import import TABLES_BY_NAME
 from reviews.models import Category, Genre, Review, Title
+from reviews.leaderboards import top_titles, trending_titles
+from reviews.ratings import score_statistics
+from reviews.search import KINDS, SearchResults
+from users.outbox import queue_stats
+from .bulk import BulkMixin
+from .fastpath import ValuesListMixin
 from .permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly, IsAdmin
+from .sparse import SparseQuerysetMixin
+from .throttling import (
+    SignUpIPThrottle,
+    SignUpUsernameThrottle,
+    TokenIPThrottle,
+    TokenUsernameThrottle
+)
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
     ReviewSerializer,
+    SearchResultSerializer,
     TitleGETSerializer,
+    TitleRankingSerializer,
     TitleSerializer,
     SignUpSerializer,
     UserSerializer,
@@ -33,28 +66,111 @@ User = get_user_model()
 
 ALLOWED_METHODS = ['get', 'post', 'patch', 'delete']
 
+TOP_TITLES_LIMIT = 10
+
+TOP_TITLES_MAX_LIMIT = 100
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('name')
-    filter_backends = (DjangoFilterBackend, )
+TRENDING_MAX_DAYS = 365
+
+EXPORT_TABLES = {
+    'titles': 'titles',
+    'reviews': 'review',
+    'comments': 'comments',
+}
+
+
+class TitleViewSet(
+    SparseQuerysetMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    BulkMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet
+):
+    cache_namespace = 'titles'
+    bulk_read_serializer_class = TitleGETSerializer
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('name')
+    filter_backends = (DjangoFilterBackend, NullsLastOrderingFilter)
     permission_classes = [IsAdminOrReadOnly, ]
     filterset_class = TitlesFilter
+    ordering_fields = ('name', 'year', 'rating', 'weighted_rating')
     http_method_names = ALLOWED_METHODS
 
+    def get_version_namespaces(self):
+        # Страница произведения зависит только от него самого, его
+        # отзывов и названий жанров и категорий, а не от всего списка.
+        if self.detail:
+            return (
+                'title', scoped('title', self.kwargs['pk']),
+                'genres', 'categories'
+            )
+        return super().get_version_namespaces()
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleGETSerializer
         return TitleSerializer
 
+    @action(detail=True, methods=['get'], url_path='stats', url_name='stats')
+    def score_stats(self, request, pk=None):
+        """
+        Распределение оценок произведения по счётчикам,
+        которые обновляются при изменении отзывов.
+        """
+        def handler():
+            title = get_object_or_404(
+                Title.objects.only('review_count', 'rating'), pk=pk
+            )
+            return Response(score_statistics(title), status=status.HTTP_200_OK)
+
+        return conditional_response(
+            request, self.get_version_namespaces(),
+            lambda: cached_response(self.cache_namespace, request, handler)
+        )
+
+    @action(detail=False, methods=['get'], url_path='top', url_name='top')
+    def top(self, request):
+        """
+        Лучшие произведения по байесовскому рейтингу с фильтрами списка;
+        с ?days=N — по отзывам за последние N дней.
+        """
+        limit = bounded_int(
+            request, 'limit', TOP_TITLES_LIMIT, TOP_TITLES_MAX_LIMIT
+        )
+        days = bounded_int(request, 'days', None, TRENDING_MAX_DAYS)
+
+        def handler():
+            queryset = self.filter_queryset(self.get_queryset())
+            if days is None:
+                titles = top_titles(queryset, limit)
+            else:
+                titles = trending_titles(queryset, days, limit)
+            serializer = TitleRankingSerializer(titles, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        # Окно «за последние дни» сдвигается с датой.
+        return conditional_response(
+            request, self.get_version_namespaces(),
+            lambda: cached_response(self.cache_namespace, request, handler),
+            vary=timezone.localdate()
+        )
+
 
 class GenreViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
+    BulkMixin,
     viewsets.GenericViewSet
 ):
+    cache_namespace = 'genres'
+    bulk_methods = ('post', 'delete')
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAdminOrReadOnly, ]
@@ -63,11 +179,22 @@ class GenreViewSet(
     lookup_field = 'slug'
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    SparseQuerysetMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = ReviewSerializer
+    values_columns = ('pub_date',)
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = PageNumberOrKeysetPagination
     http_method_names = ALLOWED_METHODS
 
+    def get_version_namespaces(self):
+        return ('reviews', scoped('reviews', self.kwargs['title_id']))
+
     def get_queryset(self):
         title = self.get_title()
         return title.reviews.all()
@@ -85,11 +212,22 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return context
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    SparseQuerysetMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
+    values_columns = ('pub_date',)
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = PageNumberOrKeysetPagination
     http_method_names = ALLOWED_METHODS
 
+    def get_version_namespaces(self):
+        return ('comments', scoped('comments', self.kwargs['review_id']))
+
     def get_review(self):
         return get_object_or_404(
             Review.objects,
@@ -105,11 +243,16 @@ class CommentViewSet(viewsets.ModelViewSet):
 
 
 class CategoryViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
+    BulkMixin,
     viewsets.GenericViewSet
 ):
+    cache_namespace = 'categories'
+    bulk_methods = ('post', 'delete')
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly, ]
@@ -118,7 +261,11 @@ class CategoryViewSet(
     lookup_field = 'slug'
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ModelViewSet
+):
     """
     Представление пользователей сайта.
     """
@@ -130,6 +277,9 @@ class UserViewSet(ModelViewSet):
     lookup_field = 'username'
     search_fields = ('username',)
 
+    def get_version_namespaces(self):
+        return ('users',)
+
     @action(
         methods=['GET', 'PATCH'],
         detail=False,
@@ -137,11 +287,17 @@ class UserViewSet(ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def get_me(self, request):
-        user = request.user
+        # В request.user загружены только поля, нужные для проверки прав.
         if request.method == 'GET':
-            return Response(
-                UserSerializer(user).data, status=status.HTTP_200_OK)
-
+            return conditional_response(
+                request, self.get_version_namespaces(),
+                lambda: Response(
+                    UserSerializer(User.objects.get(pk=request.user.pk)).data,
+                    status=status.HTTP_200_OK),
+                vary=request.user.pk
+            )
+
+        user = User.objects.get(pk=request.user.pk)
         serializer = UserSerializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save(role=user.role)
@@ -153,6 +309,7 @@ class SignUpView(APIView):
     Регистрация пользователя и отправка кода подтверждения.
     """
     permission_classes = (AllowAny,)
+    throttle_classes = (SignUpIPThrottle, SignUpUsernameThrottle)
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
@@ -166,6 +323,7 @@ class TokenObtainView(APIView):
     Получение JWT токена с использованием username и confirmation_code.
     """
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenUsernameThrottle)
 
     def post(self, request):
         serializer = ConfirmationCodeSerializer(data=request.data)
@@ -174,3 +332,113 @@ class TokenObtainView(APIView):
         result = serializer.save()
         token = result.get('token')
         return Response({'token': token}, status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка произведений, отзывов и комментариев
+    в формате NDJSON (по умолчанию) или CSV.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, table):
+        export_format = request.query_params.get('type', 'ndjson')
+        if table not in EXPORT_TABLES or export_format not in EXPORT_FORMATS:
+            raise Http404
+        csv_table = TABLES_BY_NAME[EXPORT_TABLES[table]]
+        iterator, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            iterator(csv_table), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{export_format}"'
+        )
+        return response
+
+
+class EmailQueueStatsView(APIView):
+    """
+    Глубина очереди исходящих писем.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(queue_stats(), status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    """
+    Счётчики попаданий и промахов кеша ответов каталога.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(stats(), status=status.HTTP_200_OK)
+
+
+def bounded_int(request, name, default, maximum):
+    """
+    Целый параметр запроса, ограниченный диапазоном от 1 до maximum.
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: 'Ожидается целое число.'})
+    return max(1, min(value, maximum))
+
+
+def requested_kinds(request, allowed):
+    """
+    Виды объектов из параметра ?type= через запятую.
+    """
+    kinds = request.query_params.get('type')
+    if not kinds:
+        return allowed
+    kinds = kinds.split(',')
+    unknown = set(kinds) - set(allowed)
+    if unknown:
+        raise ValidationError({
+            'type': f'Неизвестный тип: {", ".join(sorted(unknown))}.'
+        })
+    return kinds
+
+
+class SearchView(generics.GenericAPIView):
+    """
+    Полнотекстовый поиск по произведениям, отзывам и комментариям
+    с сортировкой по релевантности.
+    """
+    permission_classes = (AllowAny,)
+    serializer_class = SearchResultSerializer
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Обязательный параметр.'})
+        kinds = requested_kinds(request, KINDS)
+        page = self.paginate_queryset(SearchResults(query, kinds))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class AutocompleteView(APIView):
+    """
+    Подсказки по началу слова в названиях произведений,
+    жанров и категорий.
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        kinds = requested_kinds(request, autocomplete.KINDS)
+        limit = bounded_int(
+            request, 'limit', autocomplete.DEFAULT_LIMIT,
+            autocomplete.MAX_LIMIT
+        )
+        results = autocomplete.autocomplete_index.get().search(
+            query, kinds, limit
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
@@ -23,8 +23,15 @@ MIN_SCORE_VALIDATOR = 0
 
 MAX_SCORE_VALIDATOR = 10
 
+# Вес априорной средней оценки в байесовском рейтинге:
+# столько «средних» голосов добавляется к оценкам произведения.
+RATING_PRIOR_WEIGHT = 10
+
 STR_TEXT_LENGTH = 20
 
+# Наибольшее число элементов в одном запросе к /bulk/.
+BULK_MAX_ITEMS = 1000
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -78,6 +85,34 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Пользователь для JWT-аутентификации кешируется на TIMEOUT секунд,
+# версия его токенов — на VERSION_TIMEOUT; при сохранении через ORM кеш
+# сбрасывается сразу, но только в процессе, который сохранил
+# пользователя. Другие процессы с локальным кешем и массовые изменения
+# видят новые значения по истечении этого времени, поэтому версия,
+# по которой отзываются токены с ролью, хранится несколько секунд.
+AUTH_USER_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+    'VERSION_TIMEOUT': 5,
+}
+
+# Записывать роль и флаги администратора в выдаваемые токены. Права
+# проверяются по токену, а смена роли отзывает выданные токены.
+JWT_ROLE_CLAIMS = False
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,10 +149,35 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 4,
+    # JSON кодируется и разбирается через orjson, если он установлен,
+    # иначе стандартным json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Число доверенных прокси перед приложением: адрес клиента для
+    # ограничений частоты берётся из X-Forwarded-For только за ними.
+    # При 0 используется REMOTE_ADDR, а заголовок клиента игнорируется.
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.UserWriteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_username': '5/hour',
+        'token_ip': '30/hour',
+        'token_username': '10/hour',
+        'user_write': '120/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -125,6 +185,27 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=5),
 }
 
+BENCHMARK_BUDGET = {
+    'queries': 10,
+    'p95_ms': 500,
+    'peak_memory_kb': 10240,
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Очередь писем: BATCH_SIZE писем отправляется через одно соединение,
+# неудачная попытка повторяется через RETRY_DELAY * 2 ** (попытка - 1)
+# секунд, но не позже чем через MAX_RETRY_DELAY, после MAX_ATTEMPTS
+# попыток письмо помечается как неотправленное. LEASE — на сколько
+# секунд обработчик забирает пачку. С EAGER письма отправляются сразу
+# после постановки в очередь.
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+    'MAX_RETRY_DELAY': 3600,
+    'LEASE': 300,
+    'EAGER': False,
+}
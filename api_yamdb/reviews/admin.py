@@ -38,6 +38,8 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'description',
         'category',
+        'review_count',
+        'rating',
     )
     empty_value_display = 'значение отсутствует'
     list_filter = ('name',)
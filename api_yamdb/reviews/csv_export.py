@@ -0,0 +1,54 @@
+import json
+from csv import writer
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """
+    Псевдобуфер для csv.writer: возвращает строку вместо записи.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value, encoder=DjangoJSONEncoder()):
+    if isinstance(value, datetime):
+        return encoder.default(value)
+    return '' if value is None else value
+
+
+def export_rows(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Отдаёт заголовок и строки таблицы в раскладке static/data/*.csv,
+    читая базу порциями через серверный итератор.
+    """
+    fields = list(table.fields)
+    yield [column for column, _ in table.fields.values()]
+    rows = table.model.objects.order_by('pk').values_list(*fields)
+    yield from rows.iterator(chunk_size=chunk_size)
+
+
+def iter_csv(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    csv_writer = writer(_Echo(), lineterminator='\n')
+    for row in export_rows(table, chunk_size):
+        yield csv_writer.writerow([_csv_value(value) for value in row])
+
+
+def iter_ndjson(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = export_rows(table, chunk_size)
+    columns = next(rows)
+    for row in rows:
+        yield json.dumps(
+            dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
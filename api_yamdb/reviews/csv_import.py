@@ -0,0 +1,441 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from csv import reader
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from users.models import User
+from .models import (Category, Comment, Genre, GenreTitle, Review, Title,
+                     TitleDailyScore, TitleScoreCount)
+from .ratings import rebuild_ratings
+from .signals import bulk_changed
+from .utils import batched
+
+CSV_DIR = settings.BASE_DIR / 'static' / 'data'
+
+DEFAULT_BATCH_SIZE = 5000
+
+MIN_SHARD_SIZE = 1024 * 1024
+
+# Шард разбирается в памяти рабочего процесса целиком, поэтому
+# на больших файлах число шардов растёт с размером файла.
+MAX_SHARD_SIZE = 32 * 1024 * 1024
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def _optional_id(value):
+    return int(value) if value else None
+
+
+class CsvTable:
+    """
+    Описание импортируемой таблицы: файл, модель, преобразование строки
+    CSV в поля модели и внешние ключи, которые нужно проверить.
+    """
+
+    def __init__(self, name, filename, model, fields, references=None):
+        self.name = name
+        self.filename = filename
+        self.model = model
+        self.fields = fields
+        self.references = references or {}
+
+    def convert(self, row):
+        return {
+            field: convert(row[column])
+            for field, (column, convert) in self.fields.items()
+        }
+
+
+TABLES = (
+    CsvTable('category', 'category.csv', Category, {
+        'id': ('id', int),
+        'name': ('name', str),
+        'slug': ('slug', str),
+    }),
+    CsvTable('genre', 'genre.csv', Genre, {
+        'id': ('id', int),
+        'name': ('name', str),
+        'slug': ('slug', str),
+    }),
+    CsvTable('users', 'users.csv', User, {
+        'id': ('id', int),
+        'username': ('username', str),
+        'email': ('email', str),
+        'role': ('role', str),
+        'bio': ('bio', str),
+        'first_name': ('first_name', str),
+        'last_name': ('last_name', str),
+    }),
+    CsvTable('titles', 'titles.csv', Title, {
+        'id': ('id', int),
+        'name': ('name', str),
+        'year': ('year', int),
+        'category_id': ('category', _optional_id),
+    }, references={'category_id': 'category'}),
+    CsvTable('genre_title', 'genre_title.csv', GenreTitle, {
+        'id': ('id', int),
+        'title_id': ('title_id', int),
+        'genre_id': ('genre_id', int),
+    }, references={'title_id': 'titles', 'genre_id': 'genre'}),
+    CsvTable('review', 'review.csv', Review, {
+        'id': ('id', int),
+        'title_id': ('title_id', int),
+        'text': ('text', str),
+        'author_id': ('author', int),
+        'score': ('score', int),
+        'pub_date': ('pub_date', parse_datetime),
+    }, references={'title_id': 'titles', 'author_id': 'users'}),
+    CsvTable('comments', 'comments.csv', Comment, {
+        'id': ('id', int),
+        'review_id': ('review_id', int),
+        'text': ('text', str),
+        'author_id': ('author', int),
+        'pub_date': ('pub_date', parse_datetime),
+    }, references={'review_id': 'review', 'author_id': 'users'}),
+)
+
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+def dependent_tables(names):
+    """
+    Возвращает выбранные таблицы вместе со всеми таблицами,
+    которые ссылаются на них, в порядке импорта.
+    """
+    selected = set(names)
+    for table in TABLES:
+        if selected.intersection(table.references.values()):
+            selected.add(table.name)
+    return [table for table in TABLES if table.name in selected]
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Отключает auto_now_add на время импорта, чтобы даты
+    из CSV не заменялись текущим временем.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class IdMaps:
+    """
+    Множества существующих первичных ключей по таблицам.
+    Загружаются из базы один раз и пополняются при импорте,
+    чтобы проверять внешние ключи без запроса на каждую строку.
+    """
+
+    def __init__(self):
+        self._ids = {}
+
+    def get(self, name):
+        if name not in self._ids:
+            model = TABLES_BY_NAME[name].model
+            self._ids[name] = set(
+                model.objects.values_list('pk', flat=True).iterator()
+            )
+        return self._ids[name]
+
+    def add(self, name, ids):
+        self.get(name).update(ids)
+
+
+def _delete_all(model):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'DELETE FROM ' + connection.ops.quote_name(model._meta.db_table)
+        )
+
+
+def truncate(tables):
+    """
+    Очищает таблицы в порядке, обратном импорту. Распределения
+    оценок и оценки по дням удаляются вместе с отзывами
+    и пересчитываются в finalize_import.
+    """
+    with transaction.atomic():
+        if any(table.model in (Title, Review) for table in tables):
+            _delete_all(TitleScoreCount)
+            _delete_all(TitleDailyScore)
+        for table in reversed(tables):
+            if table.model is User:
+                User.objects.all().delete()
+                continue
+            _delete_all(table.model)
+
+
+def read_records(table, path, start=0, end=None):
+    """
+    Потоково читает записи CSV из диапазона байтов [start, end).
+    Для каждой записи отдаёт поля модели и смещение конца записи,
+    по которому можно продолжить чтение.
+    """
+    with open(path, 'rb') as file:
+        fieldnames = next(reader([file.readline().decode('utf8')]))
+        file.seek(max(start, file.tell()))
+        position = file.tell()
+        if end is None:
+            end = path.stat().st_size
+
+        def lines():
+            nonlocal position
+            while position < end:
+                line = file.readline()
+                if not line:
+                    return
+                position += len(line)
+                yield line.decode('utf8')
+
+        for row in reader(lines()):
+            if row:
+                yield table.convert(dict(zip(fieldnames, row))), position
+
+
+def _skip_to_record_start(file, offset, in_quotes):
+    """
+    Возвращает смещение начала первой записи после offset.
+    Перевод строки внутри поля в кавычках границей записи не считается.
+    """
+    file.seek(offset)
+    while True:
+        block = file.read(READ_BLOCK_SIZE)
+        if not block:
+            return offset
+        position = 0
+        while True:
+            quote = block.find(b'"', position)
+            newline = block.find(b'\n', position)
+            if newline == -1 and quote == -1:
+                break
+            if quote != -1 and (newline == -1 or quote < newline):
+                in_quotes = not in_quotes
+                position = quote + 1
+            elif in_quotes:
+                position = newline + 1
+            else:
+                return offset + newline + 1
+        offset += len(block)
+
+
+def _count_quotes(file, start, end):
+    file.seek(start)
+    count = 0
+    while start < end:
+        block = file.read(min(READ_BLOCK_SIZE, end - start))
+        if not block:
+            break
+        count += block.count(b'"')
+        start += len(block)
+    return count
+
+
+def split_shards(path, shards, start=0):
+    """
+    Делит CSV начиная со смещения start на диапазоны байтов, границы
+    которых совпадают с началом записей. Чётность кавычек до границы
+    показывает, находится ли она внутри поля в кавычках.
+    Возвращает список пар (начало, конец).
+    """
+    size = path.stat().st_size
+    with open(path, 'rb') as file:
+        start = max(start, len(file.readline()))
+        step = max((size - start) // max(shards, 1), MIN_SHARD_SIZE)
+        ranges = []
+        while start < size:
+            target = start + step
+            if target >= size:
+                ranges.append((start, size))
+                break
+            in_quotes = _count_quotes(file, start, target) % 2 == 1
+            end = _skip_to_record_start(file, target, in_quotes)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def shard_count(path, workers, start=0):
+    """
+    Число шардов: не меньше четырёх на процесс для равномерной загрузки
+    и столько, чтобы шард был не больше MAX_SHARD_SIZE.
+    """
+    size = path.stat().st_size - start
+    return max(workers * 4, -(-size // MAX_SHARD_SIZE))
+
+
+def parse_shard(table_name, path, start, end):
+    """
+    Разбирает диапазон байтов CSV в рабочем процессе.
+    """
+    return list(read_records(TABLES_BY_NAME[table_name], path, start, end))
+
+
+def _read_records_parallel(table, path, workers, start=0):
+    """
+    Разбирает шарды файла в пуле процессов и отдаёт записи
+    в исходном порядке. Вперёд запускается не больше двух шардов
+    на процесс, чтобы не держать в памяти весь файл.
+    """
+    ranges = split_shards(path, shard_count(path, workers, start), start)
+    with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+        pending = deque()
+        ranges = iter(ranges)
+        while True:
+            while len(pending) < workers * 2:
+                shard = next(ranges, None)
+                if shard is None:
+                    break
+                pending.append(
+                    pool.submit(parse_shard, table.name, path, *shard)
+                )
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+class Checkpoint:
+    """
+    JSON-файл со смещением последней зафиксированной записи
+    для каждого CSV. Перезаписывается атомарно после каждой пачки.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offsets = {}
+        if self.path.exists():
+            with open(self.path, encoding='utf8') as file:
+                self.offsets = json.load(file)
+
+    def offset(self, filename):
+        return self.offsets.get(filename, 0)
+
+    def save(self, filename, offset):
+        self.offsets[filename] = offset
+        temporary = self.path.with_name(self.path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf8') as file:
+            json.dump(self.offsets, file)
+        os.replace(temporary, self.path)
+
+    def reset(self, filenames):
+        for filename in filenames:
+            self.save(filename, 0)
+
+
+def _valid_records(table, records, id_maps, stats):
+    references = {
+        field: id_maps.get(name)
+        for field, name in table.references.items()
+    }
+    for values, offset in records:
+        if all(
+            values[field] is None or values[field] in ids
+            for field, ids in references.items()
+        ):
+            yield table.model(**values), offset
+        else:
+            stats['skipped'] += 1
+
+
+def _write_batch(table, objects, upsert, stats):
+    """
+    Вставляет пачку объектов. В режиме upsert строки с уже
+    существующими id обновляются одним bulk_update.
+    """
+    existing = set()
+    if upsert:
+        existing = set(table.model.objects.filter(
+            pk__in=[obj.pk for obj in objects]
+        ).values_list('pk', flat=True))
+    if existing:
+        table.model.objects.bulk_update(
+            [obj for obj in objects if obj.pk in existing],
+            [field for field in table.fields if field != 'id']
+        )
+        stats['updated'] += len(existing)
+    table.model.objects.bulk_create(
+        [obj for obj in objects if obj.pk not in existing]
+    )
+    stats['inserted'] += len(objects) - len(existing)
+
+
+def import_table(table, directory=CSV_DIR, batch_size=DEFAULT_BATCH_SIZE,
+                 id_maps=None, workers=1, checkpoint=None, upsert=False):
+    """
+    Потоково читает CSV и вставляет строки пачками.
+    При workers > 1 разбор файла выполняется в пуле процессов,
+    а вставка и фиксация транзакций остаются в текущем процессе.
+    Без checkpoint таблица загружается в одной транзакции, с ним каждая
+    пачка фиксируется отдельно, а смещение сохраняется в контрольную
+    точку, с которой продолжится следующий запуск.
+    Возвращает статистику: вставлено, обновлено, пропущено, секунды.
+    """
+    id_maps = id_maps or IdMaps()
+    stats = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    path = directory / table.filename
+    start = checkpoint.offset(table.filename) if checkpoint else 0
+    if workers > 1:
+        records = _read_records_parallel(table, path, workers, start)
+    else:
+        records = read_records(table, path, start)
+    started = time.perf_counter()
+    table_transaction = (
+        transaction.atomic() if checkpoint is None else nullcontext()
+    )
+    with keep_auto_now_add(table.model), table_transaction:
+        records = _valid_records(table, records, id_maps, stats)
+        for batch in batched(records, batch_size):
+            objects = [obj for obj, _ in batch]
+            with transaction.atomic(savepoint=False):
+                _write_batch(table, objects, upsert, stats)
+            id_maps.add(table.name, (obj.pk for obj in objects))
+            if checkpoint is not None:
+                checkpoint.save(table.filename, batch[-1][1])
+    if checkpoint is not None:
+        checkpoint.save(table.filename, path.stat().st_size)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def reset_sequences(tables):
+    """
+    Сдвигает последовательности первичных ключей после вставки
+    с явными id (нужно для PostgreSQL, для SQLite ничего не делает).
+    """
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [table.model for table in tables]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def finalize_import(tables):
+    """
+    Действия после массовой вставки, которая обходит сигналы моделей.
+    """
+    reset_sequences(tables)
+    if any(table.model is Review for table in tables):
+        rebuild_ratings()
+        bulk_changed.send(sender=Title)
+    for table in tables:
+        bulk_changed.send(sender=table.model)
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import TitleDailyScore
+from .ratings import prior_mean, weighted_rating_expression
+
+
+def top_titles(queryset, limit):
+    """
+    Произведения с отзывами по убыванию байесовского рейтинга.
+    Рейтинг хранится в индексированном поле, поэтому выборка
+    читает первые limit строк индекса без сортировки.
+    """
+    return list(
+        queryset.filter(review_count__gt=0)
+        .order_by('-weighted_rating', '-pk')[:limit]
+    )
+
+
+def trending_titles(queryset, days, limit):
+    """
+    Произведения по байесовскому рейтингу отзывов за последние days
+    дней. Суммируются оценки по дням, а не отзывы. У возвращённых
+    объектов weighted_rating и review_count относятся к этому периоду.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    scores = TitleDailyScore.objects.filter(day__gte=since)
+    if queryset.query.where:
+        scores = scores.filter(title__in=queryset.values('pk'))
+    rows = list(
+        scores.values('title_id').annotate(
+            recent_count=Sum('count'), recent_sum=Sum('score_sum')
+        ).annotate(
+            trend=weighted_rating_expression(
+                F('recent_count'), F('recent_sum'), prior_mean()
+            )
+        ).order_by('-trend', '-title_id')[:limit]
+    )
+    titles = queryset.in_bulk([row['title_id'] for row in rows])
+    ranked = []
+    for row in rows:
+        title = titles[row['title_id']]
+        title.weighted_rating = row['trend']
+        title.review_count = row['recent_count']
+        ranked.append(title)
+    return ranked
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from reviews.csv_export import DEFAULT_CHUNK_SIZE, iter_csv
+from reviews.csv_import import TABLES
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в CSV-файлы с той же раскладкой, '
+        'что и static/data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=Path('export'),
+            help='Каталог для CSV-файлов.'
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=[table.name for table in TABLES],
+            help='Выгрузить только указанную таблицу (можно повторять).'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['only'] or [table.name for table in TABLES]
+        options['path'].mkdir(parents=True, exist_ok=True)
+        for table in TABLES:
+            if table.name not in names:
+                continue
+            path = options['path'] / table.filename
+            with open(path, 'w', encoding='utf8', newline='') as file:
+                file.writelines(iter_csv(table, options['chunk_size']))
+            self.stdout.write(f'{table.filename} -> {path}')
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена.'))
@@ -1,75 +1,107 @@
-from csv import DictReader
+from pathlib import Path
 
 from django.core.management import BaseCommand
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 
-from users.models import User
+from reviews.csv_import import (CSV_DIR, DEFAULT_BATCH_SIZE, TABLES,
+                                Checkpoint, IdMaps, dependent_tables,
+                                finalize_import, import_table, truncate)
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов static/data в базу данных.'
 
-    def handle(self, *args, **options):
-        for row in DictReader(open('static/data/category.csv',
-                                   encoding='utf8')):
-            category = Category(name=row['name'], id=row['id'],
-                                slug=row['slug'])
-            category.save()
-        for row in DictReader(open('static/data/genre.csv', encoding='utf8')):
-            genre = Genre(name=row['name'], id=row['id'], slug=row['slug'])
-            genre.save()
-        for row in DictReader(open('static/data/titles.csv', encoding='utf8')):
-            title = Title(
-                name=row['name'],
-                id=row['id'],
-                year=row['year'],
-                category=Category.objects.get(pk=row['category'])
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=[table.name for table in TABLES],
+            help='Импортировать только указанную таблицу (можно повторять).'
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help=(
+                'Очистить выбранные таблицы и ссылающиеся на них '
+                'перед импортом.'
             )
-            title.save()
-        for row in DictReader(open('static/data/genre_title.csv',
-                                   encoding='utf8')):
-            genre_title = GenreTitle(
-                id=row['id'],
-                title=Title.objects.get(pk=row['title_id']),
-                genre=Genre.objects.get(pk=row['genre_id'])
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество процессов для разбора CSV. Файлы делятся '
+                'на шарды по диапазонам байтов, вставка выполняется '
+                'в основном процессе.'
             )
-            genre_title.save()
-        for row in DictReader(open('static/data/users.csv', encoding='utf8')):
-            user = User(
-                id=row['id'],
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                bio=row['bio'],
-                first_name=row['first_name'],
-                last_name=row['last_name']
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=Path,
+            help=(
+                'Файл контрольной точки: каждая пачка фиксируется отдельно, '
+                'а повторный запуск продолжает импорт с места остановки. '
+                'После успешного импорта файл удаляется.'
             )
-            user.save()
-        for row in DictReader(open('static/data/titles.csv', encoding='utf8')):
-            title = Title(
-                name=row['name'],
-                id=row['id'],
-                year=row['year'],
-                category=Category.objects.get(pk=row['category'])
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Обновлять строки с уже существующими id вместо ошибки.'
+        )
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=CSV_DIR,
+            help='Каталог с CSV-файлами.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['only'] or [table.name for table in TABLES]
+        tables = [table for table in TABLES if table.name in names]
+        changed = tables
+        checkpoint = None
+        if options['checkpoint']:
+            checkpoint = Checkpoint(options['checkpoint'])
+        if options['truncate']:
+            changed = dependent_tables(names)
+            truncate(changed)
+            if checkpoint is not None:
+                checkpoint.reset(table.filename for table in changed)
+
+        id_maps = IdMaps()
+        for table in tables:
+            stats = import_table(
+                table,
+                directory=options['path'],
+                batch_size=options['batch_size'],
+                id_maps=id_maps,
+                workers=options['workers'],
+                checkpoint=checkpoint,
+                upsert=options['upsert']
             )
-            title.save()
-        for row in DictReader(open('static/data/review.csv',
-                                   encoding='utf8')):
-            review = Review(
-                id=row['id'],
-                title=Title.objects.get(pk=row['title_id']),
-                text=row['text'],
-                author=User.objects.get(pk=row['author']),
-                score=row['score'],
-                pub_date=row['pub_date']
+            rate = (stats['inserted'] + stats['updated']) / max(
+                stats['seconds'], 1e-9
             )
-            review.save()
-        for row in DictReader(open('static/data/comments.csv',
-                                   encoding='utf8')):
-            comment = Comment(
-                id=row['id'],
-                review=Review.objects.get(pk=row['review_id']),
-                text=row['text'],
-                author=User.objects.get(pk=row['author']),
-                pub_date=row['pub_date']
+            self.stdout.write(
+                f'{table.filename}: {stats["inserted"]} строк '
+                f'за {stats["seconds"]:.2f} с ({rate:.0f} строк/с)'
+                + (
+                    f', обновлено {stats["updated"]}'
+                    if stats['updated'] else ''
+                )
+                + (
+                    f', пропущено {stats["skipped"]}'
+                    if stats['skipped'] else ''
+                )
             )
-            comment.save()
+        finalize_import(changed)
+        if checkpoint is not None:
+            checkpoint.path.unlink()
+        self.stdout.write(self.style.SUCCESS('Импорт завершён.'))
@@ -0,0 +1,57 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews.models import Title
+from reviews.ratings import (find_rating_drift, rebuild_ratings,
+                             refresh_prior_mean)
+from reviews.signals import bulk_changed
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые рейтинги произведений по отзывам '
+        'и проверяет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не изменяя данные.'
+        )
+        parser.add_argument(
+            '--prior',
+            action='store_true',
+            help=(
+                'Только пересчитать среднюю оценку и байесовский рейтинг '
+                'всех произведений; для запуска по расписанию.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['prior']:
+            prior = refresh_prior_mean()
+            bulk_changed.send(sender=Title, fields=('weighted_rating',))
+            self.stdout.write(self.style.SUCCESS(
+                f'Средняя оценка: {prior:.3f}'
+            ))
+            return
+        drift = list(find_rating_drift())
+        for title in drift:
+            self.stdout.write(
+                f'{title.pk} {title.name}: '
+                f'review_count {title.review_count} -> {title.actual_count}, '
+                f'score_sum {title.score_sum} -> {title.actual_sum}'
+            )
+        if options['check']:
+            if drift:
+                raise CommandError(
+                    f'Найдено расхождений рейтинга: {len(drift)}'
+                )
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено.'))
+            return
+        updated = rebuild_ratings()
+        bulk_changed.send(sender=Title)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано произведений: {updated}, '
+            f'исправлено расхождений: {len(drift)}'
+        ))
@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand, CommandError
+
+from reviews import search
+from reviews.models import Comment, Review, Title
+
+MODELS = {'title': Title, 'review': Review, 'comment': Comment}
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс произведений, '
+        'отзывов и комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=search.KINDS,
+            help='Перестроить только документы указанного вида.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=search.DEFAULT_BATCH_SIZE,
+            help='Размер пачки документов.'
+        )
+
+    def handle(self, *args, **options):
+        if search.get_backend() is None:
+            raise CommandError(
+                'Полнотекстовый поиск не поддерживается этой базой данных.'
+            )
+        for kind in options['only'] or search.KINDS:
+            indexed = search.rebuild(
+                kind, MODELS[kind].objects.all(), options['batch_size']
+            )
+            self.stdout.write(f'{kind}: {indexed}')
+        self.stdout.write(self.style.SUCCESS('Индекс перестроен.'))
@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-18 17:42
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def fill_rating_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    stats = Title.objects.annotate(
+        count=Count('reviews'),
+        total=Sum('reviews__score'),
+        avg=Avg('reviews__score')
+    ).filter(count__gt=0)
+    for title in stats.iterator():
+        Title.objects.filter(pk=title.pk).update(
+            review_count=title.count,
+            score_sum=title.total,
+            rating=title.avg
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_alter_category_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(
+            fill_rating_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2 on 2026-10-18 21:05
+
+from django.db import migrations
+
+# Схема и заполнение индекса на момент миграции; идентификатор
+# документа — первичный ключ * 4 + код вида (1, 2, 3).
+SEARCH_SQL = {
+    'sqlite': (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_search USING fts5("
+        "title_id UNINDEXED, review_id UNINDEXED, heading, body, "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "INSERT INTO reviews_search (rowid, title_id, review_id, heading, "
+        "body) "
+        "SELECT id * 4 + 1, id, NULL, COALESCE(name, ''), "
+        "COALESCE(description, '') FROM reviews_title",
+        "INSERT INTO reviews_search (rowid, title_id, review_id, heading, "
+        "body) "
+        "SELECT id * 4 + 2, title_id, id, '', COALESCE(text, '') "
+        "FROM reviews_review",
+        "INSERT INTO reviews_search (rowid, title_id, review_id, heading, "
+        "body) "
+        "SELECT comment.id * 4 + 3, review.title_id, comment.review_id, '', "
+        "COALESCE(comment.text, '') FROM reviews_comment comment "
+        "JOIN reviews_review review ON review.id = comment.review_id",
+    ),
+    'postgresql': (
+        "CREATE TABLE IF NOT EXISTS reviews_search ("
+        "id bigint PRIMARY KEY, title_id bigint, review_id bigint, "
+        "heading text NOT NULL, body text NOT NULL, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS reviews_search_document_idx "
+        "ON reviews_search USING GIN (document)",
+        "INSERT INTO reviews_search "
+        "(id, title_id, review_id, heading, body, document) "
+        "SELECT id, title_id, review_id, heading, body, "
+        "setweight(to_tsvector('russian', heading), 'A') || "
+        "setweight(to_tsvector('russian', body), 'B') FROM ("
+        "SELECT id * 4 + 1 AS id, id AS title_id, NULL::bigint AS review_id, "
+        "COALESCE(name, '') AS heading, COALESCE(description, '') AS body "
+        "FROM reviews_title "
+        "UNION ALL "
+        "SELECT id * 4 + 2, title_id, id, '', COALESCE(text, '') "
+        "FROM reviews_review "
+        "UNION ALL "
+        "SELECT comment.id * 4 + 3, review.title_id, comment.review_id, '', "
+        "COALESCE(comment.text, '') FROM reviews_comment comment "
+        "JOIN reviews_review review ON review.id = comment.review_id"
+        ") documents",
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    for sql in SEARCH_SQL.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in SEARCH_SQL:
+        schema_editor.execute('DROP TABLE IF EXISTS reviews_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 3.2 on 2026-10-18 18:14
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Cast, NullIf, TruncDate
+import django.db.models.deletion
+
+PRIOR_WEIGHT = 10
+
+DEFAULT_PRIOR = 5
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    TitleDailyScore = apps.get_model('reviews', 'TitleDailyScore')
+    RatingPrior = apps.get_model('reviews', 'RatingPrior')
+    totals = Title.objects.aggregate(
+        count=Sum('review_count'), total=Sum('score_sum')
+    )
+    prior = (
+        totals['total'] / totals['count'] if totals['count']
+        else DEFAULT_PRIOR
+    )
+    Title.objects.update(weighted_rating=(
+        Cast(F('score_sum'), FloatField()) + Value(PRIOR_WEIGHT * prior)
+    ) / (NullIf(F('review_count'), Value(0)) + Value(PRIOR_WEIGHT)))
+    RatingPrior.objects.create(pk=1, value=prior)
+    rows = Review.objects.order_by().values(
+        'title_id', day=TruncDate('pub_date')
+    ).annotate(count=Count('pk'), score_sum=Sum('score'))
+    TitleDailyScore.objects.bulk_create(
+        (TitleDailyScore(**row) for row in rows.iterator()),
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_score_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingPrior',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.FloatField(verbose_name='Средняя оценка')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Пересчитана')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка',
+                'verbose_name_plural': 'Средняя оценка',
+            },
+        ),
+        migrations.CreateModel(
+            name='TitleDailyScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+            ],
+            options={
+                'verbose_name': 'Оценки за день',
+                'verbose_name_plural': 'Оценки по дням',
+                'ordering': ('title', 'day'),
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Байесовский рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['weighted_rating'], name='title_weighted_rating_idx'),
+        ),
+        migrations.AddField(
+            model_name='titledailyscore',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_scores', to='reviews.title'),
+        ),
+        migrations.AddIndex(
+            model_name='titledailyscore',
+            index=models.Index(fields=['day', 'title'], name='dailyscore_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titledailyscore',
+            constraint=models.UniqueConstraint(fields=('title', 'day'), name='unique_title_day'),
+        ),
+        migrations.RunPython(
+            fill_leaderboards, migrations.RunPython.noop
+        ),
+    ]
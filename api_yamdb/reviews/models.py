@@ -57,6 +57,9 @@ class Category(models.Model):
         verbose_name_plural = 'Категории'
         default_related_name = 'categories'
         ordering = ['-name']
+        indexes = [
+            models.Index(fields=['name'], name='category_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -100,16 +103,70 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    weighted_rating = models.FloatField(
+        'Байесовский рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    RATING_FIELDS = ('review_count', 'score_sum', 'rating', 'weighted_rating')
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         default_related_name = 'titles'
         ordering = ('-year', 'name')
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(
+                fields=['category', 'name'],
+                name='title_category_name_idx',
+            ),
+            models.Index(fields=['rating'], name='title_rating_idx'),
+            models.Index(
+                fields=['weighted_rating'],
+                name='title_weighted_rating_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Счётчики рейтинга обновляются только через reviews.ratings,
+        поэтому при сохранении существующего произведения их устаревшие
+        значения из памяти не перезаписывают данные в базе.
+        """
+        if (
+            self.pk is not None
+            and not self._state.adding
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
@@ -119,11 +176,94 @@ class GenreTitle(models.Model):
         verbose_name = 'Жанры и произведения'
         verbose_name_plural = 'Таблица жанров и произведений'
         ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='genretitle_genre_title_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title} принадлежит жанру/ам {self.genre}'
 
 
+class TitleScoreCount(models.Model):
+    """
+    Число отзывов с данной оценкой у произведения. Строки
+    обновляются инкрементально при изменении отзывов.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts'
+    )
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество отзывов', default=0)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+        ordering = ('title', 'score')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'score'),
+                name='unique_title_score'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title}: {self.score} - {self.count}'
+
+
+class TitleDailyScore(models.Model):
+    """
+    Количество и сумма оценок отзывов произведения за день публикации.
+    По этим строкам считаются рейтинги за последние дни.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='daily_scores'
+    )
+    day = models.DateField('День')
+    count = models.PositiveIntegerField('Количество отзывов', default=0)
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+
+    class Meta:
+        verbose_name = 'Оценки за день'
+        verbose_name_plural = 'Оценки по дням'
+        ordering = ('title', 'day')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'day'),
+                name='unique_title_day'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'title'], name='dailyscore_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title}: {self.day} - {self.count}'
+
+
+class RatingPrior(models.Model):
+    """
+    Средняя оценка всех отзывов, с которой вычислен сохранённый
+    байесовский рейтинг произведений. Единственная строка меняется
+    только при пересчёте рейтингов.
+    """
+    value = models.FloatField('Средняя оценка')
+    updated_at = models.DateTimeField('Пересчитана', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Средняя оценка'
+        verbose_name_plural = 'Средняя оценка'
+
+    def __str__(self):
+        return f'{self.value:.3f}'
+
+
 class Review(models.Model):
     title = models.ForeignKey(
         Title,
@@ -144,13 +284,28 @@ class Review(models.Model):
     class Meta:
         verbose_name = 'отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
                 name='unique_review',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx',
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rating_state = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score')
+        )
+        return instance
 
     def __str__(self):
         return (
@@ -169,7 +324,13 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx',
+            )
+        ]
 
     def __str__(self):
         return (
@@ -0,0 +1,296 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import (Count, F, FloatField, IntegerField, OuterRef, Q,
+                              Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncDate
+
+from api_yamdb.settings import (
+    MAX_SCORE_VALIDATOR,
+    MIN_SCORE_VALIDATOR,
+    RATING_PRIOR_WEIGHT
+)
+from .models import (RatingPrior, Review, Title, TitleDailyScore,
+                     TitleScoreCount)
+from .utils import batched
+
+HISTOGRAM_BATCH_SIZE = 5000
+
+PRIOR_MEAN_KEY = 'ratings:prior-mean'
+
+PRIOR_MEAN_TIMEOUT = 60 * 60
+
+# Средняя оценка, пока рейтинги ни разу не пересчитывались.
+DEFAULT_PRIOR_MEAN = (MIN_SCORE_VALIDATOR + MAX_SCORE_VALIDATOR) / 2
+
+
+def _rating_expression(review_count, score_sum):
+    """
+    Рейтинг как отношение суммы оценок к их количеству;
+    при отсутствии отзывов деление на NULL даёт NULL.
+    """
+    return Cast(score_sum, FloatField()) / NullIf(review_count, Value(0))
+
+
+def weighted_rating_expression(review_count, score_sum, prior):
+    """
+    Байесовский рейтинг: к оценкам произведения добавляется
+    RATING_PRIOR_WEIGHT голосов со средней оценкой prior, поэтому
+    произведения с парой отзывов не опережают популярные.
+    Без отзывов, как и обычный рейтинг, равен NULL.
+    """
+    return (
+        Cast(score_sum, FloatField())
+        + Value(RATING_PRIOR_WEIGHT * prior)
+    ) / (NullIf(review_count, Value(0)) + Value(RATING_PRIOR_WEIGHT))
+
+
+def _compute_prior_mean():
+    totals = Title.objects.aggregate(
+        count=Sum('review_count'), total=Sum('score_sum')
+    )
+    if not totals['count']:
+        return DEFAULT_PRIOR_MEAN
+    return totals['total'] / totals['count']
+
+
+def refresh_prior_mean():
+    """
+    Пересчитывает среднюю оценку, сохраняет её и одним UPDATE
+    пересчитывает байесовский рейтинг всех произведений, чтобы
+    сохранённые значения были вычислены с одним и тем же средним.
+    Вызывается из rebuild_ratings, а не при записи отзывов.
+    """
+    value = _compute_prior_mean()
+    Title.objects.update(weighted_rating=weighted_rating_expression(
+        F('review_count'), F('score_sum'), value
+    ))
+    RatingPrior.objects.update_or_create(pk=1, defaults={'value': value})
+    cache.set(PRIOR_MEAN_KEY, value, PRIOR_MEAN_TIMEOUT)
+    return value
+
+
+def prior_mean():
+    """
+    Сохранённая средняя оценка, с которой вычислены рейтинги
+    произведений. Читается из кеша или из базы и здесь
+    не пересчитывается.
+    """
+    value = cache.get(PRIOR_MEAN_KEY)
+    if value is None:
+        value = RatingPrior.objects.filter(pk=1).values_list(
+            'value', flat=True
+        ).first()
+        if value is None:
+            value = DEFAULT_PRIOR_MEAN
+        cache.set(PRIOR_MEAN_KEY, value, PRIOR_MEAN_TIMEOUT)
+    return value
+
+
+def apply_review_delta(title_id, count_delta, score_delta):
+    """
+    Инкрементально изменяет счётчики рейтинга произведения
+    одним UPDATE без чтения строки.
+    """
+    if title_id is None or (count_delta == 0 and score_delta == 0):
+        return
+    review_count = F('review_count') + count_delta
+    score_sum = F('score_sum') + score_delta
+    Title.objects.filter(pk=title_id).update(
+        review_count=review_count,
+        score_sum=score_sum,
+        rating=_rating_expression(review_count, score_sum),
+        weighted_rating=weighted_rating_expression(
+            review_count, score_sum, prior_mean()
+        )
+    )
+
+
+def _review_stats(field):
+    """
+    Подзапрос с количеством или суммой оценок отзывов произведения.
+    """
+    aggregate = Count('pk') if field == 'count' else Sum('score')
+    return Coalesce(
+        Subquery(
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+            .annotate(value=aggregate)
+            .values('value'),
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def _apply_counter_delta(model, lookup, **deltas):
+    """
+    Изменяет счётчики строки model, найденной по lookup, одним UPDATE.
+    Строка создаётся при первом положительном изменении.
+    """
+    rows = model.objects.filter(**lookup)
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if rows.update(**changes) or min(deltas.values()) < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Строку успел создать параллельный запрос.
+        rows.update(**changes)
+
+
+def apply_score_delta(title_id, score, delta):
+    """
+    Изменяет число отзывов с оценкой score в распределении
+    оценок произведения.
+    """
+    if title_id is None or score is None or delta == 0:
+        return
+    _apply_counter_delta(
+        TitleScoreCount, {'title_id': title_id, 'score': score}, count=delta
+    )
+
+
+def apply_daily_delta(title_id, day, count_delta, score_delta):
+    """
+    Изменяет количество и сумму оценок произведения за день.
+    """
+    if title_id is None or day is None or (
+        count_delta == 0 and score_delta == 0
+    ):
+        return
+    _apply_counter_delta(
+        TitleDailyScore, {'title_id': title_id, 'day': day},
+        count=count_delta, score_sum=score_delta
+    )
+
+
+def count_review(title_id, score, day, sign=1):
+    """
+    Добавляет (sign=1) или вычитает (sign=-1) вклад одного отзыва
+    в счётчики рейтинга, распределение оценок и оценки за день.
+    """
+    apply_review_delta(title_id, sign, sign * score)
+    apply_score_delta(title_id, score, sign)
+    apply_daily_delta(title_id, day, sign, sign * score)
+
+
+def rebuild_histograms(queryset):
+    """
+    Пересчитывает распределения оценок произведений queryset
+    одним GROUP BY по отзывам.
+    """
+    TitleScoreCount.objects.filter(title__in=queryset).delete()
+    rows = Review.objects.filter(title__in=queryset).order_by().values(
+        'title_id', 'score'
+    ).annotate(count=Count('pk'))
+    for batch in batched(rows.iterator(), HISTOGRAM_BATCH_SIZE):
+        TitleScoreCount.objects.bulk_create(
+            TitleScoreCount(**row) for row in batch
+        )
+
+
+def rebuild_daily_scores(queryset):
+    """
+    Пересчитывает оценки произведений queryset по дням публикации.
+    """
+    TitleDailyScore.objects.filter(title__in=queryset).delete()
+    rows = Review.objects.filter(title__in=queryset).order_by().values(
+        'title_id', day=TruncDate('pub_date')
+    ).annotate(count=Count('pk'), score_sum=Sum('score'))
+    for batch in batched(rows.iterator(), HISTOGRAM_BATCH_SIZE):
+        TitleDailyScore.objects.bulk_create(
+            TitleDailyScore(**row) for row in batch
+        )
+
+
+def rebuild_ratings(queryset=None):
+    """
+    Пересчитывает счётчики рейтинга, байесовский рейтинг,
+    распределения оценок и оценки по дням с нуля по таблице отзывов.
+    Возвращает количество обновлённых произведений.
+    """
+    rebuild_all = queryset is None
+    if rebuild_all:
+        queryset = Title.objects.all()
+    rebuild_histograms(queryset)
+    rebuild_daily_scores(queryset)
+    queryset.update(
+        review_count=_review_stats('count'),
+        score_sum=_review_stats('sum')
+    )
+    fields = {
+        'rating': _rating_expression(F('review_count'), F('score_sum'))
+    }
+    if not rebuild_all:
+        fields['weighted_rating'] = weighted_rating_expression(
+            F('review_count'), F('score_sum'), prior_mean()
+        )
+    updated = queryset.update(**fields)
+    if rebuild_all:
+        # Полный пересчёт меняет среднюю оценку, а с ней байесовский
+        # рейтинг всех произведений.
+        refresh_prior_mean()
+    return updated
+
+
+def recalculate_title_rating(title_id):
+    """
+    Пересчитывает рейтинг и распределение оценок одного произведения.
+    """
+    rebuild_ratings(Title.objects.filter(pk=title_id))
+
+
+def find_rating_drift(queryset=None):
+    """
+    Возвращает произведения, у которых сохранённые счётчики
+    расходятся с фактическими данными отзывов.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    return queryset.annotate(
+        actual_count=_review_stats('count'),
+        actual_sum=_review_stats('sum')
+    ).filter(
+        ~Q(review_count=F('actual_count'))
+        | ~Q(score_sum=F('actual_sum'))
+    ).order_by('pk')
+
+
+def _median(histogram, count):
+    """
+    Медиана по распределению: средний отзыв или среднее
+    двух средних отзывов при чётном количестве.
+    """
+    if not count:
+        return None
+    middle = ((count - 1) // 2, count // 2)
+    values = []
+    seen = 0
+    for score, score_count in sorted(histogram.items()):
+        values.extend(
+            score for position in middle
+            if seen <= position < seen + score_count
+        )
+        seen += score_count
+    return sum(values) / len(values)
+
+
+def score_statistics(title):
+    """
+    Количество отзывов, средняя оценка, медиана и число отзывов
+    с каждой оценкой по сохранённым счётчикам произведения.
+    """
+    histogram = dict.fromkeys(
+        range(MIN_SCORE_VALIDATOR, MAX_SCORE_VALIDATOR + 1), 0
+    )
+    histogram.update(
+        title.score_counts.filter(count__gt=0).values_list('score', 'count')
+    )
+    return {
+        'count': title.review_count,
+        'mean': title.rating,
+        'median': _median(histogram, sum(histogram.values())),
+        'histogram': histogram,
+    }
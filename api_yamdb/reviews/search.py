@@ -0,0 +1,334 @@
+import re
+from abc import ABC, abstractmethod
+
+from django.db import connection as default_connection
+
+from .utils import batched
+
+SEARCH_TABLE = 'reviews_search'
+
+KINDS = ('title', 'review', 'comment')
+
+MAX_QUERY_TERMS = 10
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Идентификатор документа кодирует вид и первичный ключ объекта,
+# чтобы обновлять и удалять документ по первичному ключу индекса.
+_KIND_CODES = {'title': 1, 'review': 2, 'comment': 3}
+_KINDS_BY_CODE = {code: kind for kind, code in _KIND_CODES.items()}
+_ID_STEP = 4
+
+# Поля документа по видам: ключ объекта, произведение, отзыв,
+# заголовок и текст. None — поле отсутствует у этого вида.
+SOURCES = {
+    'title': ('reviews.Title', ('id', 'id', None, 'name', 'description')),
+    'review': ('reviews.Review', ('id', 'title_id', 'id', None, 'text')),
+    'comment': (
+        'reviews.Comment',
+        ('id', 'review__title_id', 'review_id', None, 'text')
+    ),
+}
+
+MODEL_KINDS = {label: kind for kind, (label, _) in SOURCES.items()}
+
+
+def document_id(kind, pk):
+    return pk * _ID_STEP + _KIND_CODES[kind]
+
+
+def parse_document_id(value):
+    return _KINDS_BY_CODE[value % _ID_STEP], value // _ID_STEP
+
+
+def indexes_fields(kind, fields):
+    """
+    Входит ли хотя бы одно из полей модели fields в документы вида kind.
+    """
+    _, sources = SOURCES[kind]
+    return any(
+        source and source.split('__')[0] in fields for source in sources
+    )
+
+
+def query_terms(query):
+    """
+    Слова запроса в нижнем регистре. Операторы языков запросов
+    FTS5 и tsquery отбрасываются вместе с остальной пунктуацией.
+    """
+    return re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+
+
+def documents(kind, queryset):
+    """
+    Строки индекса для объектов queryset: (идентификатор документа,
+    произведение, отзыв, заголовок, текст).
+    """
+    _, fields = SOURCES[kind]
+    columns = list(dict.fromkeys(field for field in fields if field))
+    rows = queryset.order_by().values_list(*columns)
+    for row in rows.iterator():
+        values = dict(zip(columns, row))
+        pk, title_id, review_id, heading, body = (
+            values[field] if field else None for field in fields
+        )
+        yield (
+            document_id(kind, pk), title_id, review_id,
+            heading or '', body or ''
+        )
+
+
+class SearchBackend(ABC):
+    """
+    Хранилище полнотекстового индекса в базе данных. Таблицу индекса
+    создаёт миграция reviews 0009; бэкенд только читает и пишет
+    документы. Подклассы задают id_column — столбец идентификатора
+    документа — и реализуют write, count и search.
+    """
+    table = SEARCH_TABLE
+    id_column = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @abstractmethod
+    def write(self, rows):
+        """
+        Добавляет или заменяет документы. rows — строки
+        (идентификатор документа, произведение, отзыв, заголовок,
+        текст), как их возвращает documents().
+        """
+
+    def delete(self, ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE {self.id_column} = %s',
+                [(pk,) for pk in ids]
+            )
+
+    def clear(self, kind):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} '
+                f'WHERE {self.id_column} %% %s = %s',
+                [_ID_STEP, _KIND_CODES[kind]]
+            )
+
+    def _kinds_filter(self, kinds):
+        codes = [_KIND_CODES[kind] for kind in kinds]
+        placeholders = ', '.join(['%s'] * len(codes))
+        return (
+            f'{self.id_column} %% %s IN ({placeholders})', [_ID_STEP, *codes]
+        )
+
+    @abstractmethod
+    def count(self, terms, kinds):
+        """
+        Число документов видов kinds, содержащих все слова terms
+        (по началу слова).
+        """
+
+    @abstractmethod
+    def search(self, terms, kinds, limit, offset):
+        """
+        Возвращает строки (идентификатор документа, произведение,
+        отзыв, релевантность, фрагмент) по убыванию релевантности
+        для тех же документов, что считает count.
+        """
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Индекс FTS5; релевантность — bm25 с весом заголовка 10.
+    """
+    id_column = 'rowid'
+    rank = f'bm25({SEARCH_TABLE}, 0, 0, 10.0, 1.0)'
+
+    def write(self, rows):
+        rows = list(rows)
+        self.delete(row[0] for row in rows)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} '
+                '(rowid, title_id, review_id, heading, body) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                rows
+            )
+
+    def _match(self, terms, kinds):
+        kinds_sql, params = self._kinds_filter(kinds)
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return (
+            f'FROM {self.table} WHERE {self.table} MATCH %s AND {kinds_sql}',
+            [match, *params]
+        )
+
+    def count(self, terms, kinds):
+        where, params = self._match(terms, kinds)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {where}', params)
+            return cursor.fetchone()[0]
+
+    def search(self, terms, kinds, limit, offset):
+        where, params = self._match(terms, kinds)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, title_id, review_id, -{self.rank}, '
+                f"snippet({self.table}, -1, '<mark>', '</mark>', '…', 16) "
+                f'{where} ORDER BY {self.rank}, rowid LIMIT %s OFFSET %s',
+                [*params, limit, offset]
+            )
+            return cursor.fetchall()
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Таблица с tsvector и GIN-индексом; релевантность — ts_rank
+    с весом A для заголовка и B для текста.
+    """
+    id_column = 'id'
+    config = 'russian'
+
+    def write(self, rows):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} '
+                '(id, title_id, review_id, heading, body, document) '
+                'VALUES (%s, %s, %s, %s, %s, '
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'B')) "
+                'ON CONFLICT (id) DO UPDATE SET '
+                'title_id = EXCLUDED.title_id, '
+                'review_id = EXCLUDED.review_id, '
+                'heading = EXCLUDED.heading, body = EXCLUDED.body, '
+                'document = EXCLUDED.document',
+                [(*row, row[3], row[4]) for row in rows]
+            )
+
+    def _match(self, terms, kinds):
+        kinds_sql, params = self._kinds_filter(kinds)
+        query = ' & '.join(f'{term}:*' for term in terms)
+        return (
+            f"FROM {self.table}, to_tsquery('{self.config}', %s) query "
+            f'WHERE document @@ query AND {kinds_sql}',
+            [query, *params]
+        )
+
+    def count(self, terms, kinds):
+        where, params = self._match(terms, kinds)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {where}', params)
+            return cursor.fetchone()[0]
+
+    def search(self, terms, kinds, limit, offset):
+        where, params = self._match(terms, kinds)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, title_id, review_id, '
+                'ts_rank(document, query) AS rank, '
+                f"ts_headline('{self.config}', heading || ' ' || body, "
+                "query, 'StartSel=<mark>, StopSel=</mark>, MaxWords=16, "
+                "MinWords=5') "
+                f'{where} ORDER BY rank DESC, id LIMIT %s OFFSET %s',
+                [*params, limit, offset]
+            )
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(connection=default_connection):
+    """
+    Бэкенд индекса для базы данных соединения или None,
+    если полнотекстовый поиск для неё не поддерживается.
+    """
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class(connection) if backend_class else None
+
+
+def index_queryset(kind, queryset, batch_size=DEFAULT_BATCH_SIZE,
+                   backend=None):
+    """
+    Добавляет или обновляет документы объектов queryset пачками.
+    Возвращает число проиндексированных объектов.
+    """
+    backend = backend or get_backend()
+    if backend is None:
+        return 0
+    indexed = 0
+    for batch in batched(documents(kind, queryset), batch_size):
+        backend.write(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def rebuild(kind, queryset, batch_size=DEFAULT_BATCH_SIZE, backend=None):
+    """
+    Перестраивает документы одного вида с нуля.
+    """
+    backend = backend or get_backend()
+    if backend is None:
+        return 0
+    backend.clear(kind)
+    return index_queryset(kind, queryset, batch_size, backend)
+
+
+def model_kind(model):
+    return MODEL_KINDS.get(model._meta.label)
+
+
+def index_object(instance):
+    kind = model_kind(type(instance))
+    index_queryset(kind, type(instance).objects.filter(pk=instance.pk))
+
+
+def remove_object(instance):
+    backend = get_backend()
+    if backend is not None:
+        backend.delete([document_id(model_kind(type(instance)), instance.pk)])
+
+
+class SearchResults:
+    """
+    Ленивая выборка результатов поиска для пагинатора:
+    число результатов и страница запрашиваются отдельно.
+    """
+
+    def __init__(self, query, kinds=KINDS, backend=None):
+        self.terms = query_terms(query)
+        self.kinds = kinds
+        self.backend = backend or get_backend()
+
+    def count(self):
+        if not self.terms or self.backend is None:
+            return 0
+        return self.backend.count(self.terms, self.kinds)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.terms or self.backend is None:
+            return []
+        start = index.start or 0
+        rows = self.backend.search(
+            self.terms, self.kinds, index.stop - start, start
+        )
+        results = []
+        for pk, title_id, review_id, rank, snippet in rows:
+            kind, object_id = parse_document_id(pk)
+            results.append({
+                'type': kind,
+                'id': object_id,
+                'title_id': title_id,
+                'review_id': review_id,
+                'rank': rank,
+                'snippet': snippet,
+            })
+        return results
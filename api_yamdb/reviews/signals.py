@@ -0,0 +1,117 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import search
+from .models import Comment, Review, Title
+from .ratings import count_review, recalculate_title_rating
+
+# Отправляется после массовых изменений в обход save()/delete()
+# (импорт, пересчёт рейтингов); sender — изменённая модель.
+# pks — ключи изменённых объектов, fields — изменённые поля,
+# если они известны.
+bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw, **kwargs):
+    """
+    Обновляет счётчики рейтинга, распределение оценок и оценки
+    по дням при создании или изменении отзыва.
+    """
+    if raw:
+        return
+    old_title_id, old_score = getattr(
+        instance, '_rating_state', (None, None)
+    )
+    score = int(instance.score)
+    day = timezone.localdate(instance.pub_date)
+    if created:
+        count_review(instance.title_id, score, day)
+    elif old_title_id is None or old_score is None:
+        recalculate_title_rating(instance.title_id)
+    elif (old_title_id, old_score) != (instance.title_id, score):
+        count_review(old_title_id, old_score, day, sign=-1)
+        count_review(instance.title_id, score, day)
+    instance._rating_state = (instance.title_id, score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """
+    Вычитает удалённый отзыв из счётчиков рейтинга, распределения
+    оценок и оценок по дням.
+    """
+    title_id, score = getattr(
+        instance, '_rating_state', (instance.title_id, instance.score)
+    )
+    if score is None:
+        recalculate_title_rating(title_id)
+        return
+    count_review(
+        title_id, int(score), timezone.localdate(instance.pub_date), sign=-1
+    )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def update_search_index_on_save(sender, instance, raw, **kwargs):
+    """
+    Переиндексирует изменённое произведение, отзыв или комментарий.
+    """
+    if not raw:
+        search.index_object(instance)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_title(sender, instance, raw, **kwargs):
+    """
+    Запоминает прежнее произведение отзыва: после переноса
+    документы его комментариев нужно переиндексировать.
+    """
+    title_id = getattr(instance, '_rating_state', (None, None))[0]
+    if title_id is None and instance.pk is not None and not raw:
+        title_id = Review.objects.filter(pk=instance.pk).values_list(
+            'title_id', flat=True
+        ).first()
+    instance._search_title_id = title_id
+
+
+@receiver(post_save, sender=Review)
+def update_moved_review_comments(sender, instance, created, raw, **kwargs):
+    """
+    Переиндексирует комментарии отзыва, перенесённого
+    в другое произведение.
+    """
+    title_id = getattr(instance, '_search_title_id', None)
+    if raw or created or title_id in (None, instance.title_id):
+        return
+    search.index_queryset(
+        'comment', Comment.objects.filter(review=instance)
+    )
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    search.remove_object(instance)
+
+
+@receiver(bulk_changed, sender=Title)
+@receiver(bulk_changed, sender=Review)
+@receiver(bulk_changed, sender=Comment)
+def rebuild_search_index(sender, pks=None, fields=None, **kwargs):
+    """
+    Перестраивает документы вида целиком или, если переданы pks,
+    переиндексирует только эти объекты. Изменение полей, которых
+    нет в документах, индекс не затрагивает.
+    """
+    kind = search.model_kind(sender)
+    if fields is not None and not search.indexes_fields(kind, fields):
+        return
+    if pks is None:
+        search.rebuild(kind, sender.objects.all())
+    elif pks:
+        search.index_queryset(kind, sender.objects.filter(pk__in=pks))
@@ -0,0 +1,14 @@
+from itertools import islice
+
+
+def batched(iterable, size):
+    """
+    Разбивает итерируемый объект на списки длиной не больше size,
+    не загружая его в память целиком.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management import BaseCommand
+
+from users.outbox import deliver, queue_stats
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval '
+                 'секунд.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в секундах.'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Только вывести глубину очереди.'
+        )
+
+    def write_stats(self):
+        self.stdout.write(' '.join(
+            f'{name}={value}' for name, value in queue_stats().items()
+        ))
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        while True:
+            sent = deliver(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(f'Отправлено писем: {sent}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.write_stats()
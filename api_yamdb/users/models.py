@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from .validators import validate_username
 from api_yamdb.settings import USER_INFO_MAX_LENGTH, MAX_LENGTH_CONF_CODE
@@ -53,12 +54,59 @@ class User(AbstractUser):
         blank=True,
         null=True
     )
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False
+    )
+
+    # Поля, от которых зависят права. При их изменении выданные токены
+    # с ролью отзываются увеличением token_version.
+    ACCESS_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
 
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('email', '-date_joined',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get('username')
+        instance._loaded_access = instance.access_state()
+        return instance
+
+    def access_state(self):
+        return {
+            field: self.__dict__[field]
+            for field in self.ACCESS_FIELDS if field in self.__dict__
+        }
+
+    def access_changed(self):
+        """
+        Изменились ли права с момента загрузки. Отложенные при загрузке
+        поля не сравниваются.
+        """
+        loaded = getattr(self, '_loaded_access', None)
+        return self.pk is not None and loaded is not None and any(
+            self.__dict__.get(field) != value
+            for field, value in loaded.items()
+        )
+
+    def save(self, *args, **kwargs):
+        revoke = self.access_changed()
+        if revoke:
+            # Увеличение в базе: одновременные сохранения не дадут
+            # одинаковую версию.
+            self.token_version = models.F('token_version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        if revoke:
+            self.refresh_from_db(fields=('token_version',))
+        self._loaded_access = self.access_state()
+
     def __str__(self):
         return self.username
 
@@ -73,3 +121,55 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Очередь разбирает команда
+    send_queued_emails, см. users.outbox.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не удалось отправить')
+    ]
+    subject = models.CharField('Тема', max_length=USER_INFO_MAX_LENGTH)
+    body = models.TextField('Текст')
+    from_email = models.CharField(
+        'Отправитель', max_length=USER_INFO_MAX_LENGTH
+    )
+    to = models.TextField('Получатели, по одному в строке')
+    status = models.CharField(
+        'Статус',
+        max_length=max(len(status) for status, _ in STATUS_CHOICES),
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at', 'id')
+        indexes = [
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='outgoingemail_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.to}'
+
+    @property
+    def recipients(self):
+        return self.to.splitlines()
@@ -0,0 +1,154 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def _settings():
+    return settings.EMAIL_OUTBOX
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    """
+    Ставит письмо в очередь. Строка очереди создаётся в транзакции
+    вызывающего кода, поэтому письмо не уйдёт, если она откатится.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to='\n'.join(recipients)
+    )
+    if _settings()['EAGER']:
+        transaction.on_commit(
+            lambda: deliver(OutgoingEmail.objects.filter(pk=email.pk))
+        )
+    return email
+
+
+def retry_delay(attempts):
+    options = _settings()
+    return timedelta(seconds=min(
+        options['RETRY_DELAY'] * 2 ** (attempts - 1),
+        options['MAX_RETRY_DELAY']
+    ))
+
+
+def claim_batch(batch_size=None):
+    """
+    Забирает пачку писем, срок отправки которых наступил. Их следующая
+    попытка переносится на LEASE секунд вперёд, поэтому другие
+    обработчики их не возьмут, а письма упавшего обработчика вернутся
+    в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            [:batch_size or _settings()['BATCH_SIZE']]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(
+            next_attempt_at=now + timedelta(seconds=_settings()['LEASE'])
+        )
+    return batch
+
+
+def _failed(email, error, now):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= _settings()['MAX_ATTEMPTS']:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def send_batch(batch):
+    """
+    Отправляет пачку через одно соединение с почтовым сервером
+    и сохраняет результат каждой попытки. Возвращает число
+    отправленных писем.
+    """
+    if not batch:
+        return 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        now = timezone.now()
+        for email in batch:
+            _failed(email, error, now)
+    else:
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.recipients,
+                    connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    _failed(email, error, timezone.now())
+                else:
+                    email.attempts += 1
+                    email.status = OutgoingEmail.SENT
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(batch, (
+        'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'
+    ))
+    return sum(email.status == OutgoingEmail.SENT for email in batch)
+
+
+def deliver(queryset=None, batch_size=None):
+    """
+    Разбирает очередь (или её часть из queryset) пачками, пока есть
+    письма, срок отправки которых наступил. Возвращает число
+    отправленных писем.
+    """
+    if queryset is not None:
+        return send_batch(list(
+            queryset.filter(status=OutgoingEmail.PENDING)
+        ))
+    sent = 0
+    while True:
+        batch = claim_batch(batch_size)
+        if not batch:
+            return sent
+        sent += send_batch(batch)
+
+
+def queue_stats():
+    """
+    Глубина очереди: число писем по статусам, сколько из ожидающих
+    уже пора отправить и возраст самого старого из них в секундах.
+    """
+    now = timezone.now()
+    counts = dict(
+        OutgoingEmail.objects.order_by().values_list('status').annotate(
+            count=Count('pk')
+        )
+    )
+    pending = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING)
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        **{status: counts.get(status, 0)
+           for status, _ in OutgoingEmail.STATUS_CHOICES},
+        'due': pending.filter(next_attempt_at__lte=now).count(),
+        'oldest_pending_age': (
+            round((now - oldest).total_seconds()) if oldest else None
+        ),
+    }
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        title = Title.objects.get(pk=title_id)
+        assert (title.review_count, title.score_sum) == (2, 10), (
+            'Проверьте, что при создании отзыва обновляются счётчики '
+            'рейтинга произведения.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json()['rating'] == 6.5, (
+            'Проверьте, что при изменении оценки отзыва пересчитывается '
+            'рейтинг произведения.'
+        )
+
+        for review, client in zip(reviews, (admin_client, user_client)):
+            client.delete(
+                self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                    title_id=title_id, review_id=review['id']
+                )
+            )
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json()['rating'] is None, (
+            'Проверьте, что после удаления всех отзывов рейтинг '
+            'произведения равен `None`.'
+        )
+
+    def test_02_title_update_keeps_counters(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title = Title.objects.get(pk=titles[0]['id'])
+        title.name = 'Новое название'
+        title.review_count = 0
+        title.save()
+        title.refresh_from_db()
+        assert title.review_count == 1, (
+            'Проверьте, что сохранение произведения не перезаписывает '
+            'счётчики рейтинга.'
+        )
+
+    def test_03_rebuild_ratings_command(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.filter(pk=titles[0]['id']).update(
+            review_count=7, score_sum=1, rating=None
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 5, 5.0
+        ), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'счётчики рейтинга по отзывам.'
+        )
+        call_command('rebuild_ratings', '--check')
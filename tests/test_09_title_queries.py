@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+
+from api.benchmark import explain_sql, sequential_scans
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+def create_catalog(size):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(size)
+    )
+    titles = list(Title.objects.all())
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in titles for genre in genres
+    )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.mark.parametrize('page_size', (4, 100, 1000))
+    def test_01_title_list_constant_queries(self, client, monkeypatch,
+                                            django_assert_num_queries,
+                                            page_size):
+        create_catalog(page_size)
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+
+        # COUNT для пагинации, произведения с категориями, жанры.
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL)
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert len(results[0]['genre']) == 2
+        assert results[0]['category']['slug'] == 'films'
+
+    def test_02_title_detail_queries(self, client,
+                                     django_assert_num_queries):
+        titles = create_catalog(1)
+
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0].pk)
+            )
+        assert len(response.json()['genre']) == 2
+
+    def test_03_exact_slug_filters(self, client):
+        category = Category.objects.create(name='Музыка', slug='music')
+        rock = Genre.objects.create(name='Рок', slug='rock')
+        rock_n_roll = Genre.objects.create(
+            name='Рок-н-ролл', slug='rock-n-roll'
+        )
+        blues = Genre.objects.create(name='Блюз', slug='blues')
+        both = Title.objects.create(name='A', year=1970, category=category)
+        both.genre.set([rock, blues])
+        Title.objects.create(name='B', year=1960).genre.set([rock_n_roll])
+        Title.objects.create(name='C', year=1950).genre.set([blues])
+
+        def names(**params):
+            response = client.get(self.TITLES_URL, params)
+            return [title['name'] for title in response.json()['results']]
+
+        assert names(genre='rock') == ['A'], (
+            'Проверьте, что фильтр `genre` сравнивает слаг точно.'
+        )
+        assert names(genre='rock,rock-n-roll') == ['A', 'B']
+        assert names(genre='rock,blues') == ['A', 'C']
+        assert names(genre='rock,blues', genre_mode='all') == ['A'], (
+            'Проверьте, что с `genre_mode=all` произведение должно '
+            'иметь все перечисленные жанры.'
+        )
+        assert names(genre='rock,unknown', genre_mode='all') == []
+        assert names(category='mus') == []
+        assert names(category='music,films') == ['A']
+
+    def test_04_genre_filter_uses_indexes(self, client):
+        create_catalog(10)
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            client.get(self.TITLES_URL, {'genre': 'drama,comedy'})
+            statements = [query['sql'] for query in queries.captured_queries]
+        scans = [
+            scan for sql in statements if sql.startswith('SELECT')
+            for scan in sequential_scans(explain_sql(sql))
+        ]
+        assert scans == [], (
+            'Проверьте, что фильтр по жанрам использует индексы '
+            f'вместо полного просмотра: {scans}'
+        )
@@ -0,0 +1,124 @@
+import json
+import os
+from contextlib import nullcontext
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from api.authentication import load_principal
+from api.benchmark import plain_routes, sequential_scans
+from api.urls import router
+from reviews.models import Comment, Review, Title
+
+BENCHMARK_SCALE = {
+    'titles': os.environ.get('BENCHMARK_TITLES', '20'),
+    'reviews': os.environ.get('BENCHMARK_REVIEWS', '100'),
+    'comments': os.environ.get('BENCHMARK_COMMENTS', '200'),
+}
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True)
+class Test10Benchmark:
+
+    def run_benchmark(self, tmp_path, *args, repeat='3'):
+        output = tmp_path / 'benchmark.json'
+        call_command(
+            'benchmark_api',
+            '--titles', BENCHMARK_SCALE['titles'],
+            '--reviews', BENCHMARK_SCALE['reviews'],
+            '--comments', BENCHMARK_SCALE['comments'],
+            '--repeat', repeat,
+            '--output', str(output),
+            *args
+        )
+        return json.loads(output.read_text())
+
+    def test_01_all_endpoints_within_budget(self, tmp_path):
+        results = self.run_benchmark(tmp_path)
+        for _, _, basename in router.registry:
+            assert f'{basename}-list' in results, (
+                f'Проверьте, что бенчмарк покрывает эндпоинт `{basename}`.'
+            )
+        assert {'sign_up', 'get_token', 'users-get-me'} <= set(results)
+        routes = set(plain_routes())
+        assert {'search', 'autocomplete', 'export', 'cache_stats',
+                'email_stats'} <= routes
+        for route in routes - {'export'}:
+            assert route in results, (
+                f'Проверьте, что бенчмарк покрывает маршрут `{route}`.'
+            )
+        assert {'export-titles', 'export-reviews', 'export-comments'} <= set(
+            results
+        )
+        for name, metrics in results.items():
+            assert metrics['status'] < 500, name
+            assert {'p50_ms', 'p95_ms', 'queries', 'peak_memory_kb'} <= set(
+                metrics
+            )
+
+    def test_02_budget_violation_fails(self, tmp_path):
+        with pytest.raises(CommandError):
+            self.run_benchmark(tmp_path, '--budget', '{"queries": 0}')
+
+    def test_03_explain_reports_sequential_scans(self):
+        assert sequential_scans([
+            'SCAN reviews_genre',
+            'SCAN reviews_title USING INDEX title_name_idx',
+            'SEARCH reviews_review USING INDEX review_title_pub_date_idx',
+            '  ->  Seq Scan on reviews_category  (cost=0.00..1.01)',
+        ]) == [
+            'SCAN reviews_genre',
+            '->  Seq Scan on reviews_category  (cost=0.00..1.01)',
+        ]
+        out = StringIO()
+        call_command('explain_api', '--seed', '--titles', '5', stdout=out)
+        output = out.getvalue()
+        for name in ('titles-list', 'reviews-list', 'comments-list'):
+            assert name in output
+
+    def test_04_throttles_disabled(self, tmp_path, monkeypatch):
+        # Повторов больше, чем разрешает лимит signup_username.
+        results = self.run_benchmark(tmp_path, repeat='10')
+        assert results['sign_up']['status'] == 200
+        monkeypatch.setattr('api.benchmark.unthrottled', nullcontext)
+        with pytest.raises(CommandError, match='429'):
+            self.run_benchmark(tmp_path, repeat='10')
+
+    def test_05_explain_leaves_users_and_cache(self, user, admin):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Текст')
+        cache.clear()
+        call_command('explain_api', stdout=StringIO())
+        assert not cache._cache, (
+            'Проверьте, что записанное в кеш во время прогона '
+            'не остаётся после отката.'
+        )
+        user.refresh_from_db()
+        assert user.role == user.USER
+        assert not load_principal(user.pk).is_admin, (
+            'Проверьте, что explain_api не выдаёт настоящему пользователю '
+            'роль администратора даже в кеше.'
+        )
+
+    def test_06_benchmark_measures_database_path(self, tmp_path,
+                                                 monkeypatch):
+        events = []
+        monkeypatch.setattr(
+            'api.cache._count',
+            lambda namespace, event: events.append((namespace, event))
+        )
+        cache.clear()
+        self.run_benchmark(tmp_path)
+        assert not events, (
+            'Проверьте, что замеры не проходят через кеш ответов.'
+        )
+        assert not cache._cache, (
+            'Проверьте, что ответы с синтетическими данными '
+            'не остаются в кеше после отката.'
+        )
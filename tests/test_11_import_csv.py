@@ -0,0 +1,111 @@
+import pytest
+from django.core.management import call_command
+
+from reviews import csv_import
+from reviews.models import Category, Comment, Review, Title
+from reviews.ratings import find_rating_drift
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportCsv:
+
+    def test_01_import_all_tables(self):
+        call_command('import_csv', '--batch-size', '10')
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert not find_rating_drift().exists(), (
+            'Проверьте, что после импорта пересчитываются рейтинги.'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что при импорте сохраняется дата из CSV.'
+        )
+
+    def test_02_only_and_truncate(self):
+        call_command('import_csv')
+        Category.objects.filter(pk=1).update(name='Изменено')
+
+        call_command('import_csv', '--only', 'category', '--truncate')
+        assert Category.objects.get(pk=1).name == 'Фильм'
+        assert not Title.objects.exists(), (
+            'Проверьте, что `--truncate` очищает и зависящие таблицы.'
+        )
+
+    def test_03_shards_split_on_record_boundaries(self, monkeypatch):
+        monkeypatch.setattr(csv_import, 'MIN_SHARD_SIZE', 1)
+        table = csv_import.TABLES_BY_NAME['review']
+        path = csv_import.CSV_DIR / table.filename
+        ranges = csv_import.split_shards(path, 16)
+        assert len(ranges) > 1
+        rows = [
+            row
+            for start, end in ranges
+            for row in csv_import.parse_shard(table.name, path, start, end)
+        ]
+        assert rows == list(csv_import.read_records(table, path)), (
+            'Проверьте, что шарды не разрывают записи с переводами строк '
+            'внутри кавычек.'
+        )
+
+    def test_04_parallel_import(self, monkeypatch):
+        monkeypatch.setattr(csv_import, 'MIN_SHARD_SIZE', 512)
+        call_command('import_csv', '--workers', '3')
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert not find_rating_drift().exists()
+
+    def test_05_resume_from_checkpoint(self, monkeypatch, tmp_path):
+        checkpoint = tmp_path / 'import.json'
+        write_batch = csv_import._write_batch
+        calls = []
+
+        def failing_write_batch(table, objects, upsert, stats):
+            calls.append(table.name)
+            if calls.count('review') == 3:
+                raise RuntimeError('Импорт прерван')
+            write_batch(table, objects, upsert, stats)
+
+        monkeypatch.setattr(csv_import, '_write_batch', failing_write_batch)
+        with pytest.raises(RuntimeError):
+            call_command(
+                'import_csv', '--batch-size', '10',
+                '--checkpoint', str(checkpoint)
+            )
+        assert Review.objects.count() == 20
+        assert checkpoint.exists()
+
+        monkeypatch.setattr(csv_import, '_write_batch', write_batch)
+        call_command(
+            'import_csv', '--batch-size', '10',
+            '--checkpoint', str(checkpoint)
+        )
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert not checkpoint.exists()
+        assert not find_rating_drift().exists()
+
+    def test_06_upsert_existing_ids(self):
+        call_command('import_csv')
+        Review.objects.filter(pk=1).update(score=1, text='Изменено')
+
+        call_command('import_csv', '--upsert')
+        review = Review.objects.get(pk=1)
+        assert (review.score, review.text.startswith('Ставлю')) == (
+            10, True
+        )
+        assert Review.objects.count() == 72
+        assert not find_rating_drift().exists()
+
+    def test_07_shard_size_bounded(self, monkeypatch):
+        monkeypatch.setattr(csv_import, 'MIN_SHARD_SIZE', 1)
+        monkeypatch.setattr(csv_import, 'MAX_SHARD_SIZE', 1024)
+        path = csv_import.CSV_DIR / 'review.csv'
+        count = csv_import.shard_count(path, 1)
+        assert count == -(-path.stat().st_size // 1024) > 4
+        ranges = csv_import.split_shards(path, count)
+        assert max(end - start for start, end in ranges) < 2048, (
+            'Проверьте, что размер шарда ограничен в байтах, '
+            'а не числом процессов.'
+        )
+        assert csv_import.shard_count(path, 100) == 400
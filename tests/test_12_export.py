@@ -0,0 +1,56 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Export:
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{table}/'
+
+    def test_01_export_endpoint(self, admin_client, user_client):
+        call_command('import_csv')
+        url = self.EXPORT_URL_TEMPLATE.format(table='reviews')
+
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что выгрузка `{self.EXPORT_URL_TEMPLATE}` '
+            'доступна только администратору.'
+        )
+
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert len(rows) == Review.objects.count()
+        assert set(rows[0]) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        }
+
+        response = admin_client.get(url, {'type': 'csv'})
+        assert response['Content-Type'] == 'text/csv'
+        header = b''.join(response.streaming_content).split(b'\n', 1)[0]
+        assert header == b'id,title_id,text,author,score,pub_date'
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(table='users')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_export_command_round_trip(self, tmp_path):
+        call_command('import_csv')
+        reviews = list(Review.objects.values_list('id', 'pub_date', 'score'))
+
+        call_command('export_csv', '--path', str(tmp_path))
+        call_command('import_csv', '--truncate', '--path', str(tmp_path))
+        assert list(
+            Review.objects.values_list('id', 'pub_date', 'score')
+        ) == reviews
+        assert Title.objects.count() == 32
+        assert Comment.objects.count() == 3
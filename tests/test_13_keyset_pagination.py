@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Category, Review, Title
+
+
+@pytest.fixture
+def title_with_reviews(django_user_model):
+    title = Title.objects.create(
+        name='Терминатор',
+        year=1984,
+        category=Category.objects.create(name='Фильм', slug='films')
+    )
+    for idx in range(10):
+        author = django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=5
+        )
+    # Одинаковая дата у части отзывов проверяет порядок по id.
+    Review.objects.filter(text__in=('Отзыв 3', 'Отзыв 4', 'Отзыв 5')).update(
+        pub_date=timezone.now()
+    )
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13KeysetPagination:
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_walk_all_pages(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        expected = list(
+            title_with_reviews.reviews.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data
+        assert data['previous'] is None
+        pages = [[review['id'] for review in data['results']]]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append([review['id'] for review in data['results']])
+        assert [pk for page in pages for pk in page] == expected, (
+            'Проверьте, что курсорная пагинация возвращает все отзывы '
+            'по порядку (pub_date, id) без пропусков и повторов.'
+        )
+        assert data['previous']
+
+        previous = client.get(data['previous']).json()
+        assert [review['id'] for review in previous['results']] == pages[-2]
+
+    def test_02_page_number_by_default(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        data = client.get(url).json()
+        assert data['count'] == 10, (
+            'Проверьте, что постраничная пагинация остаётся по умолчанию.'
+        )
+
+    def test_03_invalid_cursor(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        response = client.get(url, {'cursor': 'invalid'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_deep_page_has_no_count(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        data = client.get(url, {'pagination': 'cursor'}).json()
+        data = client.get(data['next']).json()
+        with CaptureQueriesContext(connection) as context:
+            client.get(data['next'])
+        assert context.captured_queries
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def title():
+    title = Title.objects.create(
+        name='Терминатор',
+        year=1984,
+        category=Category.objects.create(name='Фильм', slug='films')
+    )
+    title.genre.set([Genre.objects.create(name='Боевик', slug='action')])
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+    TITLES_URL = '/api/v1/titles/'
+    CATEGORIES_URL = '/api/v1/categories/'
+    CACHE_STATS_URL = '/api/v1/cache-stats/'
+
+    def test_01_hit_after_miss(self, client, title):
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == 'MISS'
+
+        cached = client.get(self.TITLES_URL)
+        assert cached['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный запрос `{self.TITLES_URL}` '
+            'обслуживается из кеша.'
+        )
+        assert cached.json() == response.json()
+
+        response = client.get(self.TITLES_URL, {'year': 1984})
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что параметры запроса входят в ключ кеша.'
+        )
+
+    def test_02_invalidation(self, admin_client, user_client, title):
+        detail_url = f'{self.TITLES_URL}{title.pk}/'
+        client = user_client
+        client.get(detail_url)
+        client.get(self.CATEGORIES_URL)
+
+        response = client.post(
+            f'{detail_url}reviews/', data={'text': 'Отзыв', 'score': 8}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кеш произведений.'
+        )
+        assert response.json()['rating'] == 8
+        assert client.get(self.CATEGORIES_URL)['X-Cache'] == 'HIT'
+
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Книга', 'slug': 'books'}
+        )
+        response = client.get(self.CATEGORIES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+
+        client.get(detail_url)
+        # Обновление через QuerySet обходит сигналы, кеш остаётся прежним.
+        Title.objects.update(review_count=0, score_sum=0, rating=None)
+        assert client.get(detail_url)['X-Cache'] == 'HIT'
+        call_command('rebuild_ratings')
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что пересчёт рейтингов сбрасывает кеш произведений.'
+        )
+        assert response.json()['rating'] == 8
+
+    def test_03_cache_stats(self, admin_client, user_client, title):
+        response = user_client.get(self.CACHE_STATS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.CACHE_STATS_URL}` '
+            'доступен только администратору.'
+        )
+
+        user_client.get(self.TITLES_URL)
+        user_client.get(self.TITLES_URL)
+        user_client.get(self.TITLES_URL)
+        response = admin_client.get(self.CACHE_STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['titles'] == {
+            'hits': 2, 'misses': 1, 'hit_ratio': 0.6667
+        }
+        assert response.json()['genres']['hit_ratio'] is None
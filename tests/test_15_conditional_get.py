@@ -0,0 +1,159 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.checks import run_checks
+from django.utils.http import http_date
+
+from reviews.models import Category, Review, Title
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(
+        name='Терминатор',
+        year=1984,
+        category=Category.objects.create(name='Фильм', slug='films')
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+    TITLE_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_etag(self, client, title):
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title.pk)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert etag, f'Проверьте, что ответ `{url}` содержит заголовок ETag.'
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` '
+            'возвращается 304 Not Modified.'
+        )
+        assert not response.content
+
+        other = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert other.status_code == HTTPStatus.OK
+
+        title.name = 'Терминатор 2'
+        title.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения произведения '
+            'ETag меняется.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_no_last_modified(self, client, title):
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title.pk)
+        response = client.get(url)
+        assert 'Last-Modified' not in response, (
+            'Проверьте, что Last-Modified с точностью до секунды '
+            'не отправляется.'
+        )
+        # Изменение в ту же секунду, что и чтение, меняет ETag.
+        title.name = 'Терминатор 2'
+        title.save()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=http_date()
+        ).status_code == HTTPStatus.OK
+
+    def test_03_reviews_scoped_by_title(
+        self, client, user_client, user, title
+    ):
+        other_title = Title.objects.create(name='Чужой', year=1979)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        etag = client.get(url)['ETag']
+        other_url = self.REVIEWS_URL_TEMPLATE.format(title_id=other_title.pk)
+        other_etag = client.get(other_url)['ETag']
+
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что новый отзыв меняет ETag списка отзывов.'
+        assert client.get(
+            other_url, HTTP_IF_NONE_MATCH=other_etag
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв не меняет ETag отзывов '
+            'других произведений.'
+        )
+
+        etag = client.get(url)['ETag']
+        user.username = 'renamed'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени автора меняет ETag отзывов.'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+        etag = response['ETag']
+        Review.objects.get().delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_04_users_me(self, user_client, moderator_client):
+        url = '/api/v1/users/me/'
+        etag = user_client.get(url)['ETag']
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.NOT_MODIFIED
+        assert moderator_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            f'Проверьте, что ETag `{url}` различается для пользователей.'
+        )
+
+    def test_05_shared_cache_required(self, settings):
+        settings.DEBUG = False
+        errors = [error.id for error in run_checks()]
+        assert 'api.E001' in errors, (
+            'Проверьте, что без DEBUG кеш в памяти процесса '
+            'считается ошибкой конфигурации.'
+        )
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/api_yamdb_cache',
+        }}
+        assert 'api.E001' not in [error.id for error in run_checks()]
+
+    def test_06_title_detail_scoped(self, client, user, title):
+        other = Title.objects.create(name='Чужой', year=1979)
+        genre = other.genre.create(name='Ужасы', slug='horror')
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title.pk)
+        etag = client.get(url)['ETag']
+
+        Review.objects.create(title=other, author=user, text='Отзыв', score=9)
+        other.name = 'Чужие'
+        other.save()
+        other.genre.clear()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что изменения других произведений и их отзывов '
+            'не меняют ETag страницы произведения.'
+        )
+
+        Review.objects.create(title=title, author=user, text='Отзыв', score=7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 7
+        etag = response['ETag']
+
+        title.category.name = 'Кино'
+        title.category.save()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что переименование категории меняет ETag.'
+        )
+        etag = client.get(url)['ETag']
+        title.genre.add(genre)
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).json()['genre'] == [{'name': 'Ужасы', 'slug': 'horror'}]
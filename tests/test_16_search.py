@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def indexed(user):
+    # Очистка базы между тестами не затрагивает таблицу индекса.
+    call_command('rebuild_search_index')
+    robots = Title.objects.create(
+        name='Терминатор', year=1984, description='Фильм о восстании машин'
+    )
+    Title.objects.create(
+        name='Машина времени', year=1895, description='Роман Уэллса'
+    )
+    review = Review.objects.create(
+        title=robots, author=user, text='Машины здесь страшные', score=9
+    )
+    Comment.objects.create(
+        review=review, author=user, text='Согласен про машины'
+    )
+    return robots
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Search:
+    URL = '/api/v1/search/'
+
+    def test_01_ranked_results(self, client, indexed):
+        response = client.get(self.URL, {'q': 'машин'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 4, (
+            'Проверьте, что поиск находит произведения, отзывы '
+            'и комментарии по началу слова.'
+        )
+        assert data['results'][0]['type'] == 'title'
+        assert data['results'][0]['snippet'].startswith('<mark>'), (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадений в тексте.'
+        )
+        assert {
+            (result['type'], result['title_id']) for result in data['results']
+        } >= {('review', indexed.pk), ('comment', indexed.pk)}
+
+        response = client.get(self.URL, {'q': 'машин', 'type': 'comment'})
+        assert [result['type'] for result in response.json()['results']] == [
+            'comment'
+        ]
+
+    def test_02_incremental_updates(self, client, indexed):
+        indexed.description = 'Фильм о киборгах'
+        indexed.save()
+        Review.objects.all().delete()
+        response = client.get(self.URL, {'q': 'машин'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что индекс обновляется при изменении '
+            'и удалении объектов.'
+        )
+        assert client.get(self.URL, {'q': 'киборг'}).json()['count'] == 1
+
+    def test_03_validation(self, client, indexed):
+        assert client.get(self.URL).status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.URL, {'q': 'машин', 'type': 'user'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.URL, {'q': '"*) OR NEAR('})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что операторы языка запросов не вызывают ошибку.'
+        )
+
+    def test_04_moved_review_comments(self, client, indexed):
+        other = Title.objects.get(name='Машина времени')
+        review = Review.objects.get(title=indexed)
+        review.title = other
+        review.save()
+        response = client.get(
+            self.URL, {'q': 'согласен', 'type': 'comment'}
+        )
+        assert [
+            result['title_id'] for result in response.json()['results']
+        ] == [other.pk], (
+            'Проверьте, что комментарии отзыва, перенесённого в другое '
+            'произведение, переиндексируются вместе с ним.'
+        )
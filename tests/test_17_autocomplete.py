@@ -0,0 +1,80 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.autocomplete import PrefixIndex
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def names():
+    Title.objects.create(name='Машина времени', year=1895)
+    Title.objects.create(name='Терминатор', year=1984)
+    Genre.objects.create(name='Ёлочные сказки', slug='tales')
+    Category.objects.create(name='Мультфильм', slug='cartoons')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Autocomplete:
+    URL = '/api/v1/autocomplete/'
+
+    def test_01_prefix_search(self, client, names):
+        response = client.get(self.URL, {'q': 'Вре'})
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            (result['type'], result['name'])
+            for result in response.json()['results']
+        ] == [('title', 'Машина времени')], (
+            'Проверьте, что подсказки ищут по началу любого слова названия.'
+        )
+
+        response = client.get(self.URL, {'q': 'м'})
+        assert {result['type'] for result in response.json()['results']} == {
+            'title', 'category'
+        }
+        response = client.get(self.URL, {'q': 'м', 'type': 'category'})
+        assert [
+            result['name'] for result in response.json()['results']
+        ] == ['Мультфильм']
+        response = client.get(self.URL, {'q': 'елоч'})
+        assert response.json()['results'][0]['name'] == 'Ёлочные сказки'
+        response = client.get(self.URL, {'q': 'м', 'limit': 1})
+        assert len(response.json()['results']) == 1
+        assert client.get(
+            self.URL, {'q': 'м', 'type': 'user'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_rebuilt_on_change(self, client, names):
+        client.get(self.URL, {'q': 'тер'})
+        with CaptureQueriesContext(connection) as queries:
+            client.get(self.URL, {'q': 'тер'})
+            query_count = len(queries)
+        assert query_count == 0, (
+            'Проверьте, что подсказки отдаются из индекса в памяти '
+            'без запросов к базе.'
+        )
+
+        title = Title.objects.get(name='Терминатор')
+        title.name = 'Терминатор 2'
+        title.save()
+        response = client.get(self.URL, {'q': 'тер'})
+        assert response.json()['results'][0]['name'] == 'Терминатор 2', (
+            'Проверьте, что индекс перестраивается после изменения названий.'
+        )
+        title.delete()
+        assert client.get(self.URL, {'q': 'тер'}).json()['results'] == []
+
+    def test_03_index_speed(self):
+        index = PrefixIndex(
+            ('title', pk, f'Произведение номер {pk}') for pk in range(50000)
+        )
+        started = time.perf_counter()
+        for pk in range(1000):
+            assert index.search(f'номер {pk}', limit=10)
+        elapsed = (time.perf_counter() - started) / 1000
+        assert elapsed < 0.001, (
+            'Проверьте, что поиск по индексу занимает меньше миллисекунды.'
+        )
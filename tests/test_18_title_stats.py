@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleScoreCount
+
+
+@pytest.fixture
+def title_with_scores(django_user_model):
+    title = Title.objects.create(name='Терминатор', year=1984)
+    for idx, score in enumerate((2, 8, 8, 10)):
+        author = django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=score
+        )
+    return title
+
+
+def histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(11)}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleStats:
+    STATS_URL_TEMPLATE = '/api/v1/titles/{title_id}/stats/'
+
+    def test_01_stats(self, client, title_with_scores):
+        url = self.STATS_URL_TEMPLATE.format(title_id=title_with_scores.pk)
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            statements = [query['sql'] for query in queries.captured_queries]
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'count': 4,
+            'mean': 7.0,
+            'median': 8.0,
+            'histogram': histogram(s2=1, s8=2, s10=1),
+        }
+        assert not any('reviews_review' in sql for sql in statements), (
+            'Проверьте, что статистика читается из сохранённого '
+            'распределения, а не агрегируется по отзывам.'
+        )
+
+        empty = Title.objects.create(name='Чужой', year=1979)
+        response = client.get(
+            self.STATS_URL_TEMPLATE.format(title_id=empty.pk)
+        )
+        assert response.json() == {
+            'count': 0, 'mean': None, 'median': None, 'histogram': histogram()
+        }
+        response = client.get(self.STATS_URL_TEMPLATE.format(title_id=0))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_histogram_follows_review_writes(self, client,
+                                                title_with_scores):
+        url = self.STATS_URL_TEMPLATE.format(title_id=title_with_scores.pk)
+        review = Review.objects.get(score=2)
+        review.score = 10
+        review.save()
+        Review.objects.get(author__username='author1').delete()
+        data = client.get(url).json()
+        assert data['histogram'] == histogram(s8=1, s10=2), (
+            'Проверьте, что распределение оценок обновляется '
+            'при изменении и удалении отзывов.'
+        )
+        assert data['median'] == 10.0
+
+        TitleScoreCount.objects.all().delete()
+        call_command('rebuild_ratings')
+        assert client.get(url).json()['histogram'] == histogram(s8=1, s10=2)
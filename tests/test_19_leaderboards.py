@@ -0,0 +1,179 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api_yamdb.settings import RATING_PRIOR_WEIGHT
+from reviews.models import Category, Genre, Review, Title
+from reviews.ratings import PRIOR_MEAN_KEY, prior_mean, rebuild_ratings
+
+
+@pytest.fixture
+def rated_titles(django_user_model):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(6)
+    ]
+    films = Category.objects.create(name='Фильм', slug='films')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    single = Title.objects.create(name='Один отзыв', year=2000)
+    popular = Title.objects.create(
+        name='Много отзывов', year=2001, category=films
+    )
+    popular.genre.add(drama)
+    old = Title.objects.create(name='Старый', year=2002, category=films)
+    unrated = Title.objects.create(name='Без отзывов', year=2003)
+    poor = Title.objects.create(name='Слабый', year=2004)
+    Review.objects.create(title=single, author=authors[0], text='-', score=10)
+    for author in authors:
+        Review.objects.create(title=popular, author=author, text='-', score=9)
+    for author in authors:
+        Review.objects.create(title=poor, author=author, text='-', score=2)
+    for author in authors[:3]:
+        Review.objects.create(title=old, author=author, text='-', score=10)
+    # Отзыв двухнедельной давности не попадает в недельный тренд.
+    Review.objects.filter(title=old).update(
+        pub_date=timezone.now() - timedelta(days=14)
+    )
+    rebuild_ratings()
+    return {
+        'single': single, 'popular': popular, 'old': old,
+        'unrated': unrated
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Leaderboards:
+    TITLES_URL = '/api/v1/titles/'
+    TOP_URL = '/api/v1/titles/top/'
+
+    def test_01_ordering_by_rating(self, client, rated_titles):
+        names = []
+        for page in (1, 2):
+            response = client.get(
+                self.TITLES_URL, {'ordering': '-rating', 'page': page}
+            )
+            assert response.status_code == HTTPStatus.OK
+            names += [title['name'] for title in response.json()['results']]
+        assert names == ['Старый', 'Один отзыв', 'Много отзывов',
+                         'Слабый', 'Без отзывов'], (
+            'Проверьте, что сортировка по рейтингу ставит произведения '
+            'без отзывов в конец.'
+        )
+        response = client.get(
+            self.TITLES_URL, {'ordering': 'rating', 'page': 2}
+        )
+        assert [
+            title['name'] for title in response.json()['results']
+        ] == ['Без отзывов']
+
+    def test_02_weighted_top(self, client, rated_titles):
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Много отзывов', 'Старый', 'Один отзыв', 'Слабый'
+        ], (
+            'Проверьте, что топ учитывает число отзывов и не ставит '
+            'единственную десятку выше многих девяток.'
+        )
+        assert data[0]['review_count'] == 6
+        assert data[0]['rating'] == 9
+        assert len(client.get(self.TOP_URL, {'limit': 1}).json()) == 1
+        response = client.get(self.TOP_URL, {'category': 'films'})
+        assert [title['name'] for title in response.json()] == [
+            'Много отзывов', 'Старый'
+        ]
+        response = client.get(self.TOP_URL, {'genre': 'drama'})
+        assert [title['name'] for title in response.json()] == [
+            'Много отзывов'
+        ]
+        assert client.get(
+            self.TOP_URL, {'limit': 'many'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_trending(self, client, rated_titles, django_user_model):
+        response = client.get(self.TOP_URL, {'days': 7})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Много отзывов', 'Один отзыв', 'Слабый'
+        ], (
+            'Проверьте, что тренд учитывает только отзывы за период.'
+        )
+        response = client.get(self.TOP_URL, {'days': 30})
+        assert {title['name'] for title in response.json()} == {
+            'Много отзывов', 'Старый', 'Один отзыв', 'Слабый'
+        }
+
+        Review.objects.create(
+            title=rated_titles['old'],
+            author=django_user_model.objects.get(username='author5'),
+            text='-', score=10
+        )
+        response = client.get(self.TOP_URL, {'days': 7})
+        old = [
+            title for title in response.json() if title['name'] == 'Старый'
+        ]
+        assert old and old[0]['review_count'] == 1, (
+            'Проверьте, что тренд обновляется при новых отзывах.'
+        )
+
+    def test_04_top_uses_index(self, rated_titles):
+        queryset = Title.objects.filter(review_count__gt=0).order_by(
+            '-weighted_rating', '-pk'
+        )[:10]
+        plan = queryset.explain()
+        assert 'title_weighted_rating_idx' in plan, (
+            'Проверьте, что топ читается по индексу байесовского рейтинга.'
+        )
+
+    def test_05_prior_refresh(self, rated_titles, django_user_model):
+        author = django_user_model.objects.get(username='author0')
+        Review.objects.create(
+            title=rated_titles['unrated'], author=author, text='-', score=1
+        )
+        prior = prior_mean()
+        cache.delete(PRIOR_MEAN_KEY)
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            Review.objects.create(
+                title=rated_titles['old'],
+                author=django_user_model.objects.get(username='author5'),
+                text='-', score=1
+            )
+        assert not any(
+            query['sql'].startswith('UPDATE "reviews_title"')
+            and 'WHERE' not in query['sql']
+            for query in queries.captured_queries
+        ), 'Проверьте, что запись отзыва не пересчитывает все произведения.'
+        assert prior_mean() == prior, (
+            'Проверьте, что средняя оценка читается из базы, '
+            'а не пересчитывается при истечении кеша.'
+        )
+        call_command('rebuild_ratings', '--prior', stdout=StringIO())
+        prior = prior_mean()
+        new = Title.objects.create(name='Новое', year=2005)
+        for title in Title.objects.all():
+            if title.review_count:
+                expected = (
+                    title.score_sum + RATING_PRIOR_WEIGHT * prior
+                ) / (title.review_count + RATING_PRIOR_WEIGHT)
+                assert title.weighted_rating == pytest.approx(expected), (
+                    'Проверьте, что после пересчёта средней оценки '
+                    'байесовский рейтинг пересчитывается у всех произведений.'
+                )
+        Review.objects.filter(title=rated_titles['unrated']).delete()
+        assert set(Title.objects.filter(
+            weighted_rating__isnull=True
+        ).values_list('pk', flat=True)) == {
+            rated_titles['unrated'].pk, new.pk
+        }, 'Проверьте, что у произведений без отзывов рейтинг равен NULL.'
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+from users.outbox import deliver, enqueue_email, queue_stats
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.fixture
+def queued(settings):
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20EmailOutbox:
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues(self, client, queued):
+        outbox_before_count = len(mail.outbox)
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо с кодом ставится в очередь, '
+            'а не отправляется во время запроса.'
+        )
+        assert queue_stats()['pending'] == 1
+
+        call_command('send_queued_emails')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == ['valid@yamdb.fake']
+        stats = queue_stats()
+        assert (stats['pending'], stats['sent']) == (0, 1)
+
+    def test_02_retries(self, settings, queued):
+        settings.EMAIL_BACKEND = 'tests.test_20_email_outbox.FailingBackend'
+        settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'MAX_ATTEMPTS': 2}
+        email = enqueue_email('Тема', 'Текст', ['user@yamdb.fake'])
+        assert deliver() == 0
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неудачная отправка повторяется позже.'
+        )
+        assert 'SMTP недоступен' in email.last_error
+        assert deliver() == 0
+        assert queue_stats()['due'] == 0
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        deliver()
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после MAX_ATTEMPTS попыток письмо '
+            'больше не отправляется.'
+        )
+
+    def test_03_batches_share_connection(self, settings, queued):
+        settings.EMAIL_BACKEND = (
+            'tests.test_20_email_outbox.CountingBackend'
+        )
+        CountingBackend.opened = 0
+        outbox_before_count = len(mail.outbox)
+        for idx in range(5):
+            enqueue_email('Тема', 'Текст', [f'user{idx}@yamdb.fake'])
+        assert deliver(batch_size=2) == 5
+        assert len(mail.outbox) == outbox_before_count + 5
+        assert CountingBackend.opened == 3, (
+            'Проверьте, что письма одной пачки отправляются через '
+            'одно соединение.'
+        )
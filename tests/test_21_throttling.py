@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import RequestFactory
+
+from api.throttling import SignUpIPThrottle
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates
+            }
+        }
+    return set_rates
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Throttling:
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_signup_per_username(self, client, rates):
+        rates(signup_username='2/hour')
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        for _ in range(2):
+            assert client.post(
+                self.URL_SIGNUP, data=data
+            ).status_code == HTTPStatus.OK
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что повторные запросы кода для одного username '
+            'ограничены.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок Retry-After.'
+        )
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'other@yamdb.fake', 'username': 'other_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_token_per_ip(self, client, user, rates):
+        rates(token_ip='3/min')
+        for idx in range(3):
+            response = client.post(self.URL_TOKEN, data={
+                'username': f'{user.username}{idx}',
+                'confirmation_code': '000000'
+            })
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username, 'confirmation_code': '000000'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода подтверждения с одного адреса '
+            'ограничен.'
+        )
+
+    def test_03_user_writes(self, user_client, rates):
+        rates(user_write='2/min')
+        for _ in range(2):
+            response = user_client.patch(
+                '/api/v1/users/me/', data={'bio': 'Обо мне'}
+            )
+            assert response.status_code == HTTPStatus.OK
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Обо мне'}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что изменяющие запросы пользователя ограничены.'
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что чтение не ограничивается.'
+
+    def test_04_sliding_window(self, rates, monkeypatch):
+        rates(signup_ip='10/min')
+        request = RequestFactory().post(self.URL_SIGNUP)
+        now = 6000.0
+
+        def allow():
+            throttle = SignUpIPThrottle()
+            monkeypatch.setattr(throttle, 'timer', lambda: now)
+            return throttle.allow_request(request, None), throttle
+
+        for _ in range(10):
+            assert allow()[0]
+        allowed, throttle = allow()
+        assert not allowed
+        assert throttle.wait() == 60
+
+        # Через полминуты следующего окна в оценку входит половина
+        # запросов предыдущего.
+        now += 90
+        assert [allow()[0] for _ in range(6)] == [True] * 5 + [False], (
+            'Проверьте, что лимит считается по скользящему окну.'
+        )
+
+    def test_05_forwarded_for_ignored(self, client, rates):
+        rates(signup_ip='3/min')
+        responses = [
+            client.post(self.URL_SIGNUP, data={
+                'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'
+            }, HTTP_X_FORWARDED_FOR=f'10.0.0.{idx}')
+            for idx in range(4)
+        ]
+        assert [response.status_code for response in responses] == (
+            [HTTPStatus.OK] * 3 + [HTTPStatus.TOO_MANY_REQUESTS]
+        ), (
+            'Проверьте, что лимит по адресу нельзя обойти подменой '
+            'заголовка X-Forwarded-For.'
+        )
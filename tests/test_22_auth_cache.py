@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22AuthUserCache:
+    URL = '/api/v1/categories/'
+
+    def test_01_no_user_query(self, user_client):
+        assert user_client.get(self.URL).status_code == HTTPStatus.OK
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get(self.URL)
+            statements = [query['sql'] for query in queries.captured_queries]
+        assert response.status_code == HTTPStatus.OK
+        assert not any('users_user' in sql for sql in statements), (
+            'Проверьте, что пользователь из токена берётся из кеша '
+            'без запроса к таблице пользователей.'
+        )
+
+    def test_02_invalidated_on_save(self, user_client, user):
+        data = {'name': 'Фильм', 'slug': 'films'}
+        response = user_client.post(self.URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        user.role = user.ADMIN
+        user.save()
+        response = user_client.post(self.URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что кеш пользователя сбрасывается при изменении роли.'
+        )
+
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что заблокированный пользователь теряет доступ сразу.'
+
+    def test_03_me_returns_full_profile(self, user_client, user):
+        user_client.get(self.URL)
+        response = user_client.patch('/api/v1/users/me/', data={'bio': 'Био'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert (user.bio, response.json()['email']) == ('Био', user.email), (
+            'Проверьте, что профиль читается и сохраняется целиком.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.fixture
+def role_claims(settings):
+    settings.JWT_ROLE_CLAIMS = True
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def admin_token(client, admin, role_claims):
+    admin.confirmation_code = '123456'
+    admin.save()
+    response = client.post('/api/v1/auth/token/', data={
+        'username': admin.username, 'confirmation_code': '123456'
+    })
+    assert response.status_code == HTTPStatus.OK
+    return response.json()['token']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23RoleClaims:
+    URL = '/api/v1/categories/'
+
+    def test_01_claims_in_token(self, admin, admin_token):
+        token = AccessToken(admin_token)
+        assert (token['role'], token['username']) == (
+            admin.ADMIN, admin.username
+        ), 'Проверьте, что роль записывается в токен.'
+
+        admin_client = client_for(admin_token)
+        admin_client.get(self.URL)
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                self.URL, data={'name': 'Фильм', 'slug': 'films'}
+            )
+            statements = [query['sql'] for query in queries.captured_queries]
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any('users_user' in sql for sql in statements), (
+            'Проверьте, что права проверяются по утверждениям токена.'
+        )
+
+    def test_02_role_change_revokes(self, admin, admin_token):
+        admin.role = admin.MODERATOR
+        admin.save()
+        response = client_for(admin_token).get(self.URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что смена роли отзывает выданные токены.'
+        )
+
+        admin.bio = 'Обо мне'
+        admin.save()
+        admin.confirmation_code = '654321'
+        admin.save()
+        response = APIClient().post('/api/v1/auth/token/', data={
+            'username': admin.username, 'confirmation_code': '654321'
+        })
+        new_client = client_for(response.json()['token'])
+        assert new_client.get(self.URL).status_code == HTTPStatus.OK
+        admin.bio = 'Другое'
+        admin.save()
+        assert new_client.get(self.URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что токены отзываются только при смене прав.'
+        )
+        response = new_client.post(
+            self.URL, data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_concurrent_saves(self, admin, django_user_model):
+        first = django_user_model.objects.get(pk=admin.pk)
+        second = django_user_model.objects.get(pk=admin.pk)
+        first.role = first.MODERATOR
+        second.is_active = False
+        first.save()
+        second.save()
+        assert (first.token_version, second.token_version) == (1, 2)
+        assert django_user_model.objects.get(
+            pk=admin.pk
+        ).token_version == 2, (
+            'Проверьте, что одновременные изменения прав дают разные '
+            'версии токенов.'
+        )
@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильм', slug='films')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+def titles(count, **extra):
+    return [
+        {'name': f'Произведение {idx}', 'year': 1950 + idx,
+         'category': 'films', 'genre': ['drama', 'comedy'], **extra}
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Bulk:
+    TITLES_URL = '/api/v1/bulk/titles/'
+
+    def test_01_create_titles(self, admin_client, catalog):
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                self.TITLES_URL, data=titles(50), format='json'
+            )
+            writes = [
+                query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith('INSERT')
+                and ('reviews_title' in query['sql']
+                     or 'reviews_genretitle' in query['sql'])
+            ]
+            query_count = len(queries)
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert len(data) == 50
+        assert data[0]['status'] == HTTPStatus.CREATED
+        assert data[0]['data']['name'] == 'Произведение 0'
+        assert {genre['slug'] for genre in data[0]['data']['genre']} == {
+            'drama', 'comedy'
+        }
+        assert Title.objects.count() == 50
+        assert GenreTitle.objects.count() == 100
+        assert Title.objects.get(pk=data[49]['data']['id']).name == (
+            'Произведение 49'
+        ), 'Проверьте, что в ответе id созданных произведений.'
+        assert len(writes) == 2, (
+            'Проверьте, что произведения и их жанры вставляются '
+            'массовыми запросами.'
+        )
+        assert query_count < 20, (
+            'Проверьте, что слаги всех элементов загружаются одним '
+            'запросом, а не для каждого элемента.'
+        )
+
+    def test_02_per_item_results(self, admin_client, catalog):
+        items = titles(2)
+        items[1]['genre'] = ['horror']
+        response = admin_client.post(
+            self.TITLES_URL, data=items, format='json'
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        data = response.json()
+        assert data[0]['status'] == HTTPStatus.CREATED
+        assert data[1]['status'] == HTTPStatus.BAD_REQUEST
+        assert 'genre' in data[1]['errors'], (
+            'Проверьте, что ошибки возвращаются для каждого элемента.'
+        )
+        assert Title.objects.count() == 1
+
+        response = admin_client.post(
+            self.TITLES_URL, data={'name': 'Один'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_update_and_delete_titles(self, admin_client, catalog):
+        created = admin_client.post(
+            self.TITLES_URL, data=titles(3), format='json'
+        ).json()
+        ids = [item['data']['id'] for item in created]
+        response = admin_client.patch(self.TITLES_URL, data=[
+            {'id': ids[0], 'name': 'Новое название'},
+            {'id': ids[1], 'genre': ['comedy']},
+            {'id': 0, 'name': 'Нет такого'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        data = response.json()
+        assert [item['status'] for item in data] == [200, 200, 404]
+        assert data[0]['data']['name'] == 'Новое название'
+        assert [genre['slug'] for genre in data[1]['data']['genre']] == [
+            'comedy'
+        ]
+        assert Title.objects.get(pk=ids[1]).genre.count() == 1
+
+        response = admin_client.delete(
+            self.TITLES_URL, data=[ids[0], ids[2]], format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert list(Title.objects.values_list('pk', flat=True)) == [ids[1]]
+
+    def test_04_genres_and_permissions(self, admin_client, user_client,
+                                       catalog):
+        url = '/api/v1/bulk/genres/'
+        response = admin_client.post(url, data=[
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Снова драма', 'slug': 'drama'},
+            {'name': 'Ещё ужасы', 'slug': 'horror'},
+        ], format='json')
+        assert [item['status'] for item in response.json()] == [
+            201, 400, 400
+        ], (
+            'Проверьте, что слаг проверяется на уникальность и в базе, '
+            'и внутри запроса.'
+        )
+        assert admin_client.get('/api/v1/genres/').json()['count'] == 3
+        assert admin_client.patch(
+            url, data=[{'slug': 'horror'}], format='json'
+        ).status_code == HTTPStatus.METHOD_NOT_ALLOWED
+        response = admin_client.delete(
+            url, data=['horror', 'unknown'], format='json'
+        )
+        assert [item['status'] for item in response.json()] == [204, 404]
+        assert user_client.post(
+            self.TITLES_URL, data=titles(1), format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_05_slug_bulk_not_shadowed(self, admin_client):
+        Genre.objects.create(name='Пачка', slug='bulk')
+        Category.objects.create(name='Пачка', slug='bulk')
+        for url in ('/api/v1/genres/bulk/', '/api/v1/categories/bulk/'):
+            response = admin_client.delete(url)
+            assert response.status_code == HTTPStatus.NO_CONTENT, (
+                f'Проверьте, что `{url}` — адрес объекта со слагом «bulk», '
+                f'а не пакетных операций.'
+            )
+        assert not Genre.objects.exists()
+        assert not Category.objects.exists()
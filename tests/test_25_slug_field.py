@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильм', slug='films')
+    for slug in ('drama', 'comedy', 'horror'):
+        Genre.objects.create(name=slug, slug=slug)
+
+
+def lookups(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if '"slug"' in query['sql'].split('WHERE')[-1]
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SlugField:
+    URL = '/api/v1/titles/'
+
+    def post_title(self, client, name, genre):
+        return client.post(self.URL, data={
+            'name': name, 'year': 1990, 'category': 'films', 'genre': genre
+        }, format='json')
+
+    def test_01_one_lookup_per_model(self, admin_client, catalog):
+        genres = ['drama', 'comedy', 'horror']
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_title(admin_client, 'Первое', genres)
+            statements = lookups(queries)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(statements) == 2, (
+            'Проверьте, что все слаги жанров разрешаются одним запросом.'
+        )
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_title(admin_client, 'Второе', genres)
+            statements = lookups(queries)
+        assert response.status_code == HTTPStatus.CREATED
+        assert set(response.json()['genre']) == set(genres)
+        assert statements == [], (
+            'Проверьте, что известные слаги берутся из отображения '
+            'в памяти без запросов.'
+        )
+        assert set(
+            Title.objects.get(name='Второе').genre.values_list(
+                'slug', flat=True
+            )
+        ) == set(genres)
+
+    def test_02_invalidated_on_change(self, admin_client, catalog):
+        assert self.post_title(
+            admin_client, 'Первое', ['drama']
+        ).status_code == HTTPStatus.CREATED
+        response = self.post_title(admin_client, 'Второе', ['western'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        assert self.post_title(
+            admin_client, 'Второе', ['western']
+        ).status_code == HTTPStatus.CREATED, (
+            'Проверьте, что отображение слагов сбрасывается '
+            'при добавлении жанра.'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        assert self.post_title(
+            admin_client, 'Третье', ['drama']
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что удалённый жанр больше не принимается.'
+        )
+
+    def test_03_stale_slug_map(self, admin_client, catalog):
+        assert self.post_title(
+            admin_client, 'Первое', ['drama', 'comedy']
+        ).status_code == HTTPStatus.CREATED
+        # Жанры меняются в обход сигналов, как в другом процессе
+        # до сброса версии: отображение слагов устаревает.
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM reviews_genretitle")
+            cursor.execute(
+                "DELETE FROM reviews_genre WHERE slug IN ('drama', 'comedy')"
+            )
+        Genre.objects.bulk_create([Genre(name='Комедия', slug='comedy')])
+        comedy = Genre.objects.get(slug='comedy')
+
+        response = self.post_title(admin_client, 'Второе', ['drama'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что слаг, удалённый в другом процессе, '
+            'даёт ошибку 400, а не 500.'
+        )
+        assert 'genre' in response.json()
+        response = self.post_title(admin_client, 'Третье', ['comedy'])
+        assert response.status_code == HTTPStatus.CREATED
+        assert list(Title.objects.get(name='Третье').genre.values_list(
+            'pk', flat=True
+        )) == [comedy.pk], (
+            'Проверьте, что пересозданный слаг связывается с новым объектом.'
+        )
+
+        admin_client.post(self.URL, data={
+            'name': 'Четвёртое', 'year': 1990, 'category': 'films',
+            'genre': ['horror']
+        }, format='json')
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM reviews_genretitle")
+            cursor.execute("DELETE FROM reviews_genre WHERE slug = 'horror'")
+        response = admin_client.post('/api/v1/bulk/titles/', data=[
+            {'name': 'Пятое', 'year': 1990, 'category': 'films',
+             'genre': ['horror']},
+            {'name': 'Шестое', 'year': 1990, 'category': 'films',
+             'genre': ['comedy']},
+        ], format='json')
+        assert [item['status'] for item in response.json()] == [400, 201]
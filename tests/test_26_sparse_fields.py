@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def title(user):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(
+        name='Поворот', year=1990, description='Описание', category=category
+    )
+    title.genre.set([
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ])
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return title
+
+
+def statements(client, url):
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [query['sql'] for query in queries.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SparseFields:
+    URL = '/api/v1/titles/'
+
+    def test_01_default_unchanged(self, client, title):
+        data = client.get(f'{self.URL}{title.pk}/').json()
+        assert set(data) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        }
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}, (
+            'Проверьте, что без ?fields связи выводятся вложенными объектами.'
+        )
+
+    def test_02_fields_narrow_query(self, client, title):
+        response, sql = statements(client, f'{self.URL}?fields=id,name')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [
+            {'id': title.pk, 'name': 'Поворот'}
+        ]
+        assert not any('JOIN' in query for query in sql), (
+            'Проверьте, что без запрошенных связей нет соединений '
+            'и предзагрузки.'
+        )
+        select = [query for query in sql if 'reviews_title' in query][-1]
+        assert '"description"' not in select, (
+            'Проверьте, что невыбранные столбцы не загружаются.'
+        )
+
+    def test_03_slugs_and_expand(self, client, title):
+        url = f'{self.URL}{title.pk}/?fields=name,genre,category'
+        response, sql = statements(client, url)
+        data = response.json()
+        assert data['category'] == 'films'
+        assert sorted(data['genre']) == ['comedy', 'drama'], (
+            'Проверьте, что нераскрытые связи выводятся слагами.'
+        )
+        assert not any('"description"' in query for query in sql)
+        data = client.get(f'{url}&expand=genre').json()
+        assert set(data) == {'name', 'genre', 'category'}
+        assert {'name': 'Драма', 'slug': 'drama'} in data['genre'], (
+            'Проверьте, что ?expand выводит связь вложенными объектами.'
+        )
+        data = client.get(
+            f'{self.URL}{title.pk}/?fields=id&expand=category'
+        ).json()
+        assert data == {
+            'id': title.pk, 'category': {'name': 'Фильм', 'slug': 'films'}
+        }
+
+    def test_04_reviews_and_comments(self, client, title, user):
+        review = title.reviews.get()
+        url = f'{self.URL}{title.pk}/reviews/'
+        response, sql = statements(client, f'{url}?fields=id,score')
+        assert response.json()['results'] == [{'id': review.pk, 'score': 7}]
+        assert not any('"text"' in query for query in sql)
+        response, _ = statements(client, f'{url}?fields=author')
+        assert response.json()['results'] == [{'author': user.username}]
+        data = client.get(
+            f'{url}{review.pk}/comments/?fields=text'
+        ).json()
+        assert data['results'] == [{'text': 'Комментарий'}]
+
+    @pytest.mark.parametrize('query', (
+        '?fields=id,unknown',
+        '?expand=description',
+    ))
+    def test_05_invalid(self, client, title, query):
+        response = client.get(f'{self.URL}{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестные поля в ?fields и ?expand '
+            'отклоняются с кодом 400.'
+        )
+        response = client.get(f'{self.URL}{title.pk}/reviews/?expand=author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
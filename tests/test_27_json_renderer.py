@@ -0,0 +1,86 @@
+import datetime
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = OrderedDict((
+    ('name', 'Произведение «Кавычки»'),
+    ('rating', 7.25),
+    ('price', Decimal('1.5')),
+    ('created', datetime.datetime(
+        2021, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+    )),
+    ('day', datetime.date(2021, 5, 1)),
+    ('genre', [{'name': 'Драма', 'slug': 'drama'}]),
+    ('counts', {1: 2, 10: 0}),
+    ('empty', None),
+    ('big', 2 ** 70),
+))
+
+
+class Test27JSONRenderer:
+
+    @pytest.mark.parametrize('available', (True, False))
+    def test_01_same_output(self, monkeypatch, available):
+        if not available:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), 'Проверьте, что вывод совпадает с JSONRenderer.'
+        assert FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        ) == JSONRenderer().render(DATA, 'application/json; indent=4')
+        assert FastJSONRenderer().render(None) == b''
+
+    @pytest.mark.parametrize('available', (True, False))
+    def test_02_parser(self, monkeypatch, available):
+        if not available:
+            monkeypatch.setattr(parsers, 'orjson', None)
+        # Целые за пределами 64 бит orjson разбирает как float.
+        content = JSONRenderer().render(
+            {key: value for key, value in DATA.items() if key != 'big'}
+        )
+        assert FastJSONParser().parse(BytesIO(content)) == (
+            JSONParser().parse(BytesIO(content))
+        )
+        for invalid in (b'{"name": ', b'[NaN]', b''):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(BytesIO(invalid))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_uses_fast_codecs(self, admin_client):
+        response = admin_client.post('/api/v1/genres/', data=json.dumps(
+            {'name': 'Драма', 'slug': 'drama'}
+        ), content_type='application/json')
+        assert response.status_code == 201
+        assert isinstance(response.accepted_renderer, FastJSONRenderer)
+        assert response.content == JSONRenderer().render(response.data)
+
+    @pytest.mark.benchmark
+    @pytest.mark.django_db(transaction=True)
+    def test_04_benchmark(self, tmp_path):
+        output = tmp_path / 'json.json'
+        call_command(
+            'benchmark_json', '--titles', '20', '--reviews', '20',
+            '--repeat', '2', '--output', str(output)
+        )
+        results = json.loads(output.read_text())
+        assert set(results) == {
+            'titles-json', 'titles-fast', 'reviews-json', 'reviews-fast'
+        }
+        for name, metrics in results.items():
+            assert metrics['items'] == 20, name
+            assert metrics['identical'], (
+                f'Проверьте, что вывод `{name}` совпадает с JSONRenderer.'
+            )
@@ -0,0 +1,96 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(user, admin):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    for idx in range(6):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=1990 + idx,
+            description=f'Описание «{idx}»',
+            category=category if idx % 3 else None
+        )
+        title.genre.set(genres[:idx % 4])
+    title = Title.objects.get(name='Произведение 1')
+    for author, score in ((user, 7), (admin, 3)):
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {score}', score=score
+        )
+        for idx in range(5):
+            Comment.objects.create(
+                review=review, author=user, text=f'Комментарий {idx}'
+            )
+    return title
+
+
+def compare(client, monkeypatch, viewset, url):
+    cache.clear()
+    fast = client.get(url)
+    monkeypatch.setattr(viewset, 'values_read', False)
+    cache.clear()
+    regular = client.get(url)
+    monkeypatch.undo()
+    assert fast.status_code == regular.status_code == 200
+    assert fast.content == regular.content, (
+        f'Проверьте, что ответ `{url}` из values() совпадает '
+        f'с ответом сериализатора.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ValuesRead:
+
+    @pytest.mark.parametrize('query', (
+        '',
+        '?page=2',
+        '?ordering=-year',
+        '?genre=genre-0',
+        '?fields=id,name,genre,category',
+        '?fields=name,rating&expand=genre',
+        '?fields=id&expand=category',
+    ))
+    def test_01_titles(self, client, monkeypatch, catalog, query):
+        compare(client, monkeypatch, TitleViewSet, f'/api/v1/titles/{query}')
+
+    @pytest.mark.parametrize('query', (
+        '', '?pagination=cursor', '?fields=author,score'
+    ))
+    def test_02_reviews_and_comments(self, client, monkeypatch, catalog,
+                                     query):
+        url = f'/api/v1/titles/{catalog.pk}/reviews/'
+        compare(client, monkeypatch, ReviewViewSet, f'{url}{query}')
+        review = catalog.reviews.first()
+        compare(
+            client, monkeypatch, CommentViewSet,
+            f'{url}{review.pk}/comments/{query.replace("score", "text")}'
+        )
+
+    def test_03_cursor_walk(self, client, catalog):
+        review = catalog.reviews.first()
+        url = (f'/api/v1/titles/{catalog.pk}/reviews/{review.pk}/comments/'
+               f'?pagination=cursor')
+        texts = []
+        while url:
+            data = client.get(url).json()
+            texts.extend(comment['text'] for comment in data['results'])
+            url = data['next']
+        assert texts == [f'Комментарий {idx}' for idx in range(4, -1, -1)]
+
+    def test_04_queries_per_page(self, client, catalog):
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get('/api/v1/titles/').status_code == 200
+        assert len(queries) == 3, (
+            'Проверьте, что страница произведений загружается запросами '
+            'количества, строк и жанров.'
+        )